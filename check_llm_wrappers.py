@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Check that the LLM cache and provider hedging take effect inside real
+CrewAI runs. Runs one-task crews against the local mock backends from
+load_test.py: a repeated run must be answered from the cache, routed runs
+must go through the provider pool, and a dead primary must fail over
+and be priced as the backup that answered.
+
+    python check_llm_wrappers.py
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+
+from load_test import start_mock_backends
+
+
+def run_crew(llm) -> str:
+    from crewai import Agent, Task, Crew
+    agent = Agent(role="Writer", goal="Write a short report", backstory="You write reports.",
+                  llm=llm, allow_delegation=False, verbose=False)
+    task = Task(description="Write a report about caching.", expected_output="A report.", agent=agent)
+    return str(Crew(agents=[agent], tasks=[task], verbose=False).kickoff())
+
+
+def check_cache(server) -> bool:
+    from llm_cache import CachedLLM, DiskLLMCache
+    from llm_routing import build_llm
+
+    print("🗄️ Checking the LLM response cache...")
+    llm = build_llm("OpenAI", "gpt-3.5-turbo", "sk-mock", use_cache=False)
+    cache = DiskLLMCache(path=os.environ["LLM_CACHE_PATH"])
+    first = run_crew(CachedLLM(llm, cache))
+    calls_before = server.counters.get("llm_calls", 0)
+    print(f"   first run: {calls_before} backend calls")
+    cached = CachedLLM(llm, cache)
+    second = run_crew(cached)
+    backend_calls = server.counters.get("llm_calls", 0) - calls_before
+    ok = cached.hits > 0 and backend_calls == 0 and first == second
+    print(f"   {'✅' if ok else '❌'} repeated run: {cached.hits} cache hits, {backend_calls} backend calls")
+    return ok
+
+
+def check_hedging(server) -> bool:
+    from llm_routing import MODEL_CATALOG, POLICY_FAST, estimate_cost, run_routed
+    from provider_pool import ProviderPool
+
+    print("\n🛟 Checking provider hedging and failover...")
+    pool_keys = {"OpenAI": "sk-mock", "Groq": "gsk-mock"}
+    pool = ProviderPool(["OpenAI", "Groq"], primary="OpenAI")
+    try:
+        run_routed("writing", POLICY_FAST, "OpenAI", "sk-mock", run_crew, pool=pool, pool_keys=pool_keys)
+    finally:
+        pool.close()
+    routed_ok = pool.stats["calls"] > 0
+    print(f"   {'✅' if routed_ok else '❌'} routed run: {pool.stats}")
+
+    # Primary pointed at a closed port: every call must fail over to Groq, and be priced as Groq
+    def run_with_dead_primary(llm) -> str:
+        llm.models["OpenAI"].api_base = "http://127.0.0.1:9/v1"
+        llm.models["OpenAI"].base_url = "http://127.0.0.1:9/v1"
+        return run_crew(llm)
+
+    route_metrics = []
+    pool = ProviderPool(["OpenAI", "Groq"], primary="OpenAI")
+    try:
+        run_routed("writing", POLICY_FAST, "OpenAI", "sk-mock", run_with_dead_primary,
+                   route_metrics=route_metrics, pool=pool, pool_keys=pool_keys)
+    finally:
+        pool.close()
+    route = route_metrics[0]
+    failover_ok = (pool.stats["failovers"] > 0 and pool.stats["backup_wins"] > 0
+                   and route["provider"] == "Groq" and route["model"] == MODEL_CATALOG["Groq"]["fast"]
+                   and route["cost"] == estimate_cost(route["model"], route["prompt_tokens"], route["completion_tokens"])
+                   and route["prompt_tokens"] > 0)
+    print(f"   {'✅' if failover_ok else '❌'} dead primary: {pool.stats}, "
+          f"route priced as {route['provider']} {route['model']} (${route['cost']:.5f})")
+    return routed_ok and failover_ok
+
+
+if __name__ == "__main__":
+    server = start_mock_backends(0.0, 0.0)
+    with tempfile.TemporaryDirectory(prefix="llm-check-") as work_dir:
+        base = f"http://127.0.0.1:{server.server_address[1]}/v1"
+        os.environ["OPENAI_API_BASE"] = base
+        os.environ["OPENAI_BASE_URL"] = base
+        os.environ["GROQ_API_BASE"] = base
+        os.environ["LLM_CACHE_PATH"] = os.path.join(work_dir, "llm_cache.sqlite")
+        try:
+            results = [check_cache(server), check_hedging(server)]
+        finally:
+            server.shutdown()
+    sys.exit(0 if all(results) else 1)
@@ -2,11 +2,43 @@
 """
 Setup verification script for AI Deep Research Agent (CrewAI)
 Checks Python version and key dependencies
+
+Usage:
+    python check_setup.py                 # full check (imports each package)
+    python check_setup.py --fast          # no imports: find_spec + metadata vs requirements.txt
+    python check_setup.py --deep          # also measure import time and memory per package
+    python check_setup.py --fast --json report.json
 """
 
 import sys
+import os
+import re
+import json
+import argparse
 import subprocess
 import importlib
+import importlib.util
+import importlib.metadata
+from concurrent.futures import ThreadPoolExecutor
+
+REQUIREMENTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "requirements.txt")
+
+# Distributions whose import name is not the distribution name with '-' -> '_'
+IMPORT_NAMES = {
+    "beautifulsoup4": "bs4",
+    "python-dotenv": "dotenv",
+}
+
+# Measures one package import in a fresh interpreter (peak RSS is in KB on Linux)
+DEEP_PROBE = """
+import json, resource, sys, time
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"import_seconds": elapsed, "rss_kb_delta": after - before, "rss_kb_peak": after}}))
+"""
 
 def check_python_version():
     """Check if Python version is 3.11+"""
@@ -52,7 +84,7 @@ def check_dependencies():
         ("langchain", "LangChain"),
         ("openai", "OpenAI"),
         ("firecrawl", "Firecrawl"),
-        ("beautifulsoup4", "BeautifulSoup4"),
+        ("bs4", "BeautifulSoup4"),
         ("requests", "Requests")
     ]
     
@@ -67,6 +99,122 @@ def check_dependencies():
     
     return all_ok
 
+def parse_requirements(path=REQUIREMENTS_FILE):
+    """Parse 'name>=x,<y' pins from requirements.txt, skipping comments."""
+    requirements = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return requirements
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        match = re.match(r"^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(.*)$", line)
+        if not match:
+            continue
+        name, spec = match.groups()
+        constraints = [c.strip() for c in spec.split(",") if c.strip()]
+        requirements.append((name, constraints))
+    return requirements
+
+def _version_tuple(version):
+    parts = []
+    for piece in re.split(r"[.+-]", version):
+        match = re.match(r"\d+", piece)
+        if not match:
+            break
+        parts.append(int(match.group()))
+    return tuple(parts)
+
+def version_satisfies(version, constraints):
+    """Check a version against constraints like '>=1.2' and '<3.0.0'."""
+    operators = {
+        ">=": lambda a, b: a >= b,
+        "<=": lambda a, b: a <= b,
+        "==": lambda a, b: a == b,
+        "!=": lambda a, b: a != b,
+        ">": lambda a, b: a > b,
+        "<": lambda a, b: a < b,
+    }
+    current = _version_tuple(version)
+    for constraint in constraints:
+        match = re.match(r"^(>=|<=|==|!=|>|<)\s*(.+)$", constraint)
+        if not match:
+            continue
+        op, wanted = match.groups()
+        wanted = _version_tuple(wanted)
+        width = max(len(current), len(wanted))
+        a = current + (0,) * (width - len(current))
+        b = wanted + (0,) * (width - len(wanted))
+        if not operators[op](a, b):
+            return False
+    return True
+
+def probe_package(name, constraints):
+    """Resolve a requirement without importing it."""
+    module = IMPORT_NAMES.get(name.lower(), name.replace("-", "_").lower())
+    result = {"package": name, "module": module, "required": ",".join(constraints)}
+    try:
+        result["version"] = importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        result["version"] = None
+    try:
+        result["found"] = importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        result["found"] = False
+    result["ok"] = bool(result["found"] and result["version"]
+                        and version_satisfies(result["version"], constraints))
+    return result
+
+def measure_import(module):
+    """Import a module in a subprocess and report its import time and memory."""
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-c", DEEP_PROBE.format(module=module)],
+            capture_output=True, text=True, timeout=300
+        )
+    except subprocess.TimeoutExpired:
+        return {"import_error": "timed out"}
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()
+        return {"import_error": error[-1] if error else "import failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def check_dependencies_fast(deep=False):
+    """Check requirements.txt pins in parallel without importing anything (unless deep)."""
+    print("\n📦 Checking dependencies against requirements.txt...")
+    requirements = parse_requirements()
+    workers = min(16, max(1, len(requirements)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda req: probe_package(*req), requirements))
+        if deep:
+            # Each import runs in its own interpreter, so they can run side by side
+            measurements = executor.map(
+                lambda r: measure_import(r["module"]) if r["found"] else {}, results
+            )
+            for result, measurement in zip(results, measurements):
+                result.update(measurement)
+                if "import_error" in measurement:
+                    result["ok"] = False
+
+    for result in results:
+        required = f" (requires {result['required']})" if result["required"] else ""
+        if result["ok"]:
+            line = f"   ✅ {result['package']} {result['version']} - OK"
+        elif not result["found"] or not result["version"]:
+            line = f"   ❌ {result['package']} - NOT FOUND{required}"
+        elif "import_error" in result:
+            line = f"   ❌ {result['package']} {result['version']} - IMPORT FAILED: {result['import_error']}"
+        else:
+            line = f"   ❌ {result['package']} {result['version']} - VERSION MISMATCH{required}"
+        if "import_seconds" in result:
+            line += f" [{result['import_seconds']:.2f}s, +{result['rss_kb_delta'] / 1024:.1f} MB]"
+        print(line)
+
+    return all(result["ok"] for result in results), results
+
 def check_api_keys():
     """Check if API keys are set in environment (optional)"""
     print("\n🔑 Checking API keys...")
@@ -96,16 +244,45 @@ def check_api_keys():
 
 def main():
     """Run all checks"""
+    parser = argparse.ArgumentParser(description="Verify the AI Deep Research Agent setup")
+    parser.add_argument("--fast", action="store_true",
+                        help="Resolve packages without importing them (suitable for readiness checks)")
+    parser.add_argument("--deep", action="store_true",
+                        help="Also measure import time and memory per package")
+    parser.add_argument("--json", metavar="PATH", help="Write a machine-readable report to PATH")
+    args = parser.parse_args()
+    
     print("🔍 AI Deep Research Agent (CrewAI) - Setup Verification")
     print("=" * 60)
     
+    packages = None
+    if args.fast or args.deep:
+        dependencies_ok, packages = check_dependencies_fast(deep=args.deep)
+    else:
+        dependencies_ok = check_dependencies()
+    
     checks = [
         check_python_version(),
         check_sqlite_version(),
-        check_dependencies(),
+        dependencies_ok,
         check_api_keys()
     ]
     
+    if args.json:
+        report = {
+            "ok": all(checks),
+            "python": sys.version.split()[0],
+            "checks": {
+                "python_version": checks[0],
+                "sqlite_version": checks[1],
+                "dependencies": checks[2],
+            },
+            "packages": packages,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.json}")
+    
     print("\n" + "=" * 60)
     if all(checks):
         print("🎉 All checks passed! You're ready to run the app.")
@@ -118,6 +295,10 @@ def main():
         print("   2. Create virtual environment: python3.11 -m venv venv311")
         print("   3. Activate: source venv311/bin/activate")
         print("   4. Install: pip install -r requirements.txt")
+    
+    # Non-zero exit lets the fast/deep modes act as readiness checks
+    if (args.fast or args.deep) and not all(checks):
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,16 +1,14 @@
 import asyncio
 import streamlit as st
-from crewai import Agent, Task, Crew
-from langchain_community.tools import StructuredTool
-from langchain_openai import ChatOpenAI
-from langchain_groq import ChatGroq
 import os
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
-import time
 import json
 from typing import Dict, Any, List
+from llm_routing import MODEL_CATALOG, ROUTING_POLICIES, DEFAULT_ROUTING
+from research_pipeline import run_research_job, run_refresh_job
+from research_service import submit_job, iter_job_events, get_job
+from run_checkpoints import new_run_id
+from run_metrics import RunMetricsStore, format_duration
 
 # Set page configuration
 st.set_page_config(
@@ -58,6 +56,24 @@ if "research_history" not in st.session_state:
     st.session_state.research_history = []
 if "current_research" not in st.session_state:
     st.session_state.current_research = None
+if "model_routing" not in st.session_state:
+    st.session_state.model_routing = dict(DEFAULT_ROUTING)
+if "use_llm_cache" not in st.session_state:
+    st.session_state.use_llm_cache = True
+if "failover_enabled" not in st.session_state:
+    st.session_state.failover_enabled = False
+if "hedge_after" not in st.session_state:
+    st.session_state.hedge_after = 0
+if "provider_health" not in st.session_state:
+    st.session_state.provider_health = {}
+if "failed_run_id" not in st.session_state:
+    st.session_state.failed_run_id = None
+if "resume_requested" not in st.session_state:
+    st.session_state.resume_requested = False
+if "refresh_requested" not in st.session_state:
+    st.session_state.refresh_requested = None
+if "research_service_url" not in st.session_state:
+    st.session_state.research_service_url = os.getenv("RESEARCH_SERVICE_URL", "")
 
 # Sidebar for API keys and configuration
 with st.sidebar:
@@ -109,6 +125,38 @@ with st.sidebar:
     if firecrawl_api_key:
         st.session_state.firecrawl_api_key = firecrawl_api_key
     
+    # Backup provider for hedging and failover
+    st.header("🛟 Provider Failover")
+    st.session_state.failover_enabled = st.checkbox(
+        "Enable Hedging & Failover",
+        value=st.session_state.failover_enabled,
+        help="Send slow LLM calls to a backup provider as well and fail over automatically on errors"
+    )
+    if st.session_state.failover_enabled:
+        backup_provider = "Groq" if provider == "OpenAI" else "OpenAI"
+        backup_key_name = "groq_api_key" if backup_provider == "Groq" else "openai_api_key"
+        backup_api_key = st.text_input(
+            f"{backup_provider} API Key (Backup)",
+            value=st.session_state[backup_key_name],
+            type="password",
+            help=f"Used when {provider} is slow or failing"
+        )
+        if backup_api_key:
+            st.session_state[backup_key_name] = backup_api_key
+        st.session_state.hedge_after = st.slider(
+            "Hedge After (seconds)", 0, 60, st.session_state.hedge_after,
+            help="How long to wait before also asking the backup provider (0 = automatic, based on observed p95 latency)"
+        )
+    
+    # Optional standalone research service
+    st.header("🔬 Research Service")
+    st.session_state.research_service_url = st.text_input(
+        "Research Service URL (Optional)",
+        value=st.session_state.research_service_url,
+        placeholder="http://127.0.0.1:8765",
+        help="Run research on a research_service.py worker pool instead of inside this app"
+    ).strip()
+    
     # Debug mode
     debug_mode = st.checkbox("Debug Mode", help="Show detailed error messages and API responses")
     if debug_mode:
@@ -120,30 +168,53 @@ with st.sidebar:
     st.markdown("---")
     st.header("🔧 Research Configuration")
     
+    # Completion times are predicted from past runs with this provider
+    time_model = RunMetricsStore().model(provider, used_firecrawl=bool(st.session_state.firecrawl_api_key))
+    
+    # (max_depth, time_limit minutes, max_urls) for the fixed modes; Deep uses its default sliders
+    mode_params = {
+        "Fast Research": (1, 1, 5),
+        "Standard Research": (2, 2, 8),
+        "Deep Research": (3, 4, 12),
+    }
+    
+    def describe_mode(mode):
+        if mode not in mode_params:
+            return mode
+        depth, minutes, urls = mode_params[mode]
+        estimate = time_model.describe({"max_depth": depth, "time_limit": minutes * 60, "max_urls": urls})
+        return f"{mode} ({estimate})"
+    
     # Research Mode Selection
     research_mode = st.selectbox(
         "Research Mode",
-        ["Fast Research (1-2 min)", "Standard Research (2-4 min)", "Deep Research (4-6 min)"],
-        help="Choose research speed vs. depth"
+        list(mode_params) + ["Target Deadline"],
+        format_func=describe_mode,
+        help="Choose research speed vs. depth, or set a deadline and let the parameters be picked for you"
     )
     
     # Research Parameters based on mode
     st.subheader("Research Parameters")
     
-    if research_mode == "Fast Research (1-2 min)":
-        max_depth = 1
-        time_limit = 1
-        max_urls = 5
+    if research_mode == "Fast Research":
+        max_depth, time_limit, max_urls = mode_params[research_mode]
         st.info("⚡ Fast mode: Shallow research, fewer sources, quick results")
-    elif research_mode == "Standard Research (2-4 min)":
-        max_depth = 2
-        time_limit = 2
-        max_urls = 8
+    elif research_mode == "Standard Research":
+        max_depth, time_limit, max_urls = mode_params[research_mode]
         st.info("⚖️ Standard mode: Balanced depth and speed")
-    else:  # Deep Research
+    elif research_mode == "Deep Research":
         max_depth = st.slider("Research Depth", 1, 5, 3, help="How deep to search (1=shallow, 5=very deep)")
         time_limit = st.slider("Time Limit (minutes)", 1, 10, 4, help="Maximum research time")
         max_urls = st.slider("Max Sources", 5, 20, 12, help="Maximum number of sources to analyze")
+    else:  # Target Deadline
+        deadline = st.slider("Deadline (minutes)", 1, 15, 5, help="Latest acceptable completion time")
+        tuned, _, fits = time_model.tune_for_deadline(deadline * 60)
+        max_depth, time_limit, max_urls = tuned["max_depth"], tuned["time_limit"] // 60, tuned["max_urls"]
+        if fits:
+            st.info(f"🎯 Depth {max_depth}, {max_urls} sources, {time_limit} min research limit")
+        else:
+            st.warning(f"🎯 A {deadline} min deadline is tighter than the fastest settings are likely to finish; "
+                       f"using depth {max_depth}, {max_urls} sources")
     
     # Store parameters in session state
     st.session_state.research_params = {
@@ -152,6 +223,34 @@ with st.sidebar:
         "max_urls": max_urls,
         "research_mode": research_mode
     }
+    prediction = time_model.predict(st.session_state.research_params)
+    st.session_state.research_estimate = (
+        f"{format_duration(prediction['low'])}–{format_duration(prediction['high'])}"
+    )
+    if prediction['from_history']:
+        st.caption(f"⏱️ Estimated {st.session_state.research_estimate}, "
+                   f"from {prediction['samples']} past {provider} runs")
+    else:
+        st.caption(f"⏱️ Estimated {st.session_state.research_estimate} "
+                   f"(rough default until a few {provider} runs have completed)")
+    
+    # Model routing per task
+    st.markdown("---")
+    st.header("🧭 Model Routing")
+    catalog = MODEL_CATALOG[provider]
+    st.caption(f"Fast: {catalog['fast']} · Strong: {catalog['strong']}")
+    for task_name, label in [("research", "Research Task Model"), ("writing", "Writing Task Model")]:
+        st.session_state.model_routing[task_name] = st.selectbox(
+            label,
+            ROUTING_POLICIES,
+            index=ROUTING_POLICIES.index(st.session_state.model_routing[task_name]),
+            help="Cascade tries the fast model first and escalates to the strong model if the output fails validation"
+        )
+    st.session_state.use_llm_cache = st.checkbox(
+        "Use LLM Response Cache",
+        value=st.session_state.use_llm_cache,
+        help="Reuse stored completions for identical prompts. Uncheck to force fresh LLM calls for this run."
+    )
     
     # Research Tips
     st.markdown("---")
@@ -185,11 +284,19 @@ research_topic = st.text_input(
     help="Be specific for better research results"
 )
 
+# Check if required API keys are available
+def check_api_keys():
+    if st.session_state.selected_provider == "OpenAI":
+        return bool(st.session_state.openai_api_key)
+    elif st.session_state.selected_provider == "Groq":
+        return bool(st.session_state.groq_api_key)
+    return False
+
 # Research History
 if st.session_state.research_history:
     with st.expander(f"📚 Research History ({len(st.session_state.research_history)} items)"):
         for i, research in enumerate(reversed(st.session_state.research_history)):
-            col1, col2 = st.columns([3, 1])
+            col1, col2, col3 = st.columns([3, 1, 1])
             with col1:
                 st.write(f"**{research['topic']}**")
                 st.caption(f"Research completed: {research['timestamp'].strftime('%Y-%m-%d %H:%M')}")
@@ -197,440 +304,97 @@ if st.session_state.research_history:
                 if st.button(f"View {i+1}", key=f"view_{i}"):
                     st.session_state.current_research = research
                     st.rerun()
-
-# Enhanced deep research tool with Firecrawl integration
-def deep_research_tool(query: str, max_depth: int, time_limit: int, max_urls: int) -> str:
-    """
-    A tool to perform deep research on a given topic using Firecrawl (preferred) or web scraping (fallback).
-    """
-    try:
-        # Check if Firecrawl API key is available
-        if st.session_state.firecrawl_api_key:
-            st.info("🔍 Using Firecrawl for advanced web research...")
-            return deep_research_with_firecrawl(query, max_depth, time_limit, max_urls)
-        else:
-            st.warning("⚠️ No Firecrawl API key provided. Using basic web scraping (limited results).")
-            st.info("💡 Get a free Firecrawl API key from https://firecrawl.dev for better research results!")
-            return deep_research_with_scraping(query)
-    except Exception as e:
-        st.error(f"❌ Research error: {str(e)}")
-        return f"Error during research: {str(e)}"
-
-def deep_research_with_firecrawl(query: str, max_depth: int, time_limit: int, max_urls: int) -> str:
-    """Use Firecrawl for advanced web research."""
-    try:
-        # Check if firecrawl package is available
-        try:
-            from firecrawl import FirecrawlApp
-        except ImportError:
-            return f"""
-# FIRECRAWL NOT INSTALLED
-
-To use advanced web research, please install Firecrawl:
-
-```bash
-pip install firecrawl
-```
-
-Then get your API key from: https://firecrawl.dev
-
-For now, using basic web research...
-"""
-        
-        # Initialize FirecrawlApp with the API key from session state
-        firecrawl_app = FirecrawlApp(api_key=st.session_state.firecrawl_api_key)
-        
-        # Set up a callback for real-time updates with progress tracking
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        def on_activity(activity):
-            activity_type = activity.get('type', 'info')
-            message = activity.get('message', 'Processing...')
-            
-            # Update progress based on activity type
-            if 'searching' in activity_type.lower():
-                progress_bar.progress(25)
-            elif 'analyzing' in activity_type.lower():
-                progress_bar.progress(50)
-            elif 'synthesizing' in activity_type.lower():
-                progress_bar.progress(75)
-            elif 'complete' in activity_type.lower():
-                progress_bar.progress(100)
-            
-            status_text.text(f"[{activity_type.upper()}] {message}")
-            if st.session_state.get('debug_mode', False):
-                st.write(f"🔍 [{activity_type}] {message}")
-        
-        # Run deep research with correct API format
-        with st.spinner("Performing deep research..."):
-            results = firecrawl_app.deep_research(
-                query=query,
-                maxDepth=max_depth,
-                timeLimit=time_limit,
-                maxUrls=max_urls,
-                on_activity=on_activity
-            )
-        
-        # Clear progress indicators
-        progress_bar.empty()
-        status_text.empty()
-        
-        if results and results.get('success') and results.get('data'):
-            research_data = results['data']
-            
-            # Extract final analysis and sources
-            final_analysis = research_data.get('finalAnalysis', 'No analysis available')
-            sources = research_data.get('sources', [])
-            activities = research_data.get('activities', [])
-            
-            # Format sources for display
-            sources_info = []
-            for i, source in enumerate(sources[:5]):  # Show first 5 sources
-                title = source.get('title', 'Untitled')
-                url = source.get('url', 'No URL')
-                description = source.get('description', 'No description')
-                sources_info.append(f"**{i+1}. {title}**\n   URL: {url}\n   {description[:100]}...")
-            
-            return f"""
-# FIRECRAWL DEEP RESEARCH RESULTS FOR: {query}
-
-## Research Parameters:
-- **Query**: {query}
-- **Max Depth**: {max_depth}
-- **Max URLs**: {max_urls}
-- **Time Limit**: {time_limit} seconds
-
-## Final Analysis:
-{final_analysis}
-
-## Key Sources Analyzed:
-{chr(10).join(sources_info) if sources_info else 'No sources available'}
-
-## Research Quality:
-- ✅ Professional deep research
-- ✅ {len(sources)} sources analyzed
-- ✅ AI-powered content synthesis
-- ✅ Real-time progress tracking
-- ✅ High-quality content filtering
-
-## Research Activities:
-- {len(activities)} research steps completed
-- Advanced web crawling and analysis
-- Content synthesis and summarization
-
-## Note:
-This research was conducted using Firecrawl's advanced deep research technology.
-"""
-        else:
-            return f"""
-# FIRECRAWL RESEARCH COMPLETED
-
-**Query**: {query}
-
-**Status**: Research completed but no data returned. This might be due to:
-- Rate limiting
-- Search engine blocking
-- Network issues
-- API configuration problems
-
-**Recommendation**: Try again or use a different search query.
-"""
-            
-    except Exception as e:
-        return f"""
-# FIRECRAWL RESEARCH ERROR
-
-**Query**: {query}
-**Error**: {str(e)}
-
-**Fallback**: Using basic web research instead...
-"""
-
-def deep_research_with_scraping(query: str) -> str:
-    """Perform real web research using multiple sources."""
-    try:
-        research_results = []
-        
-        # Search on multiple platforms
-        search_engines = [
-            f"https://www.google.com/search?q={query.replace(' ', '+')}",
-            f"https://www.bing.com/search?q={query.replace(' ', '+')}",
-            f"https://duckduckgo.com/?q={query.replace(' ', '+')}"
-        ]
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        for i, search_url in enumerate(search_engines[:2]):  # Limit to 2 engines to avoid rate limiting
-            try:
-                response = requests.get(search_url, headers=headers, timeout=10)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Extract search results
-                if 'google' in search_url:
-                    # Google results
-                    for result in soup.find_all('div', class_='g')[:3]:
-                        title_elem = result.find('h3')
-                        snippet_elem = result.find('div', class_='VwiC3b')
-                        if title_elem and snippet_elem:
-                            title = title_elem.get_text().strip()
-                            snippet = snippet_elem.get_text().strip()
-                            research_results.append(f"**{title}**: {snippet}")
-                
-                elif 'bing' in search_url:
-                    # Bing results
-                    for result in soup.find_all('li', class_='b_algo')[:3]:
-                        title_elem = result.find('h2')
-                        snippet_elem = result.find('p')
-                        if title_elem and snippet_elem:
-                            title = title_elem.get_text().strip()
-                            snippet = snippet_elem.get_text().strip()
-                            research_results.append(f"**{title}**: {snippet}")
-                            
-            except Exception as e:
-                research_results.append(f"Error searching {search_url}: {str(e)}")
-        
-        # Add some structured research information
-        research_summary = f"""
-# COMPREHENSIVE RESEARCH RESULTS FOR: {query}
-
-## Sources Analyzed:
-- Multiple search engines queried
-- Recent and relevant information gathered
-- Cross-referenced data from various sources
-
-## Key Findings:
-"""
-        
-        if research_results:
-            research_summary += "\n".join([f"- {result}" for result in research_results[:5]])
-        else:
-            research_summary += """
-- Topic analysis based on current knowledge
-- General information about the subject
-- Recommendations for further research
-"""
-        
-        research_summary += f"""
-
-## Research Methodology:
-- Web search across multiple platforms
-- Content analysis and synthesis
-- Information verification and cross-referencing
-
-## Recommendations:
-- Consider consulting academic databases for scholarly sources
-- Review recent publications and reports
-- Engage with subject matter experts for deeper insights
-
-## Note:
-This research was conducted using web scraping techniques. For academic or professional use, consider using specialized research databases and peer-reviewed sources.
-"""
-        
-        return research_summary
-        
-    except Exception as e:
-        return f"""
-# RESEARCH ERROR
-Unable to complete web research for: {query}
-
-Error: {str(e)}
-
-## Fallback Information:
-Based on general knowledge about {query}, here are some key points to consider:
-
-1. **Definition**: {query} is a topic that requires comprehensive analysis
-2. **Current Trends**: Recent developments in this area show significant activity
-3. **Key Considerations**: Important factors to consider include methodology, context, and implications
-4. **Future Directions**: This topic continues to evolve with new research and applications
-
-Please try again or consider using a different research approach.
-"""
-
-# Check if required API keys are available
-def check_api_keys():
-    if st.session_state.selected_provider == "OpenAI":
-        return bool(st.session_state.openai_api_key)
-    elif st.session_state.selected_provider == "Groq":
-        return bool(st.session_state.groq_api_key)
-    return False
-
-def test_groq_connection():
-    """Test Groq API connection with a simple request."""
-    try:
-        headers = {
-            "Authorization": f"Bearer {st.session_state.groq_api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": "llama3-8b-8192",
-            "messages": [
-                {"role": "user", "content": "Hello! Please respond with 'Connection successful'."}
-            ],
-            "max_tokens": 50
-        }
-        
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            if st.session_state.get('debug_mode', False):
-                st.json(result)
-            return True, "Connection successful"
-        else:
-            return False, f"API Error: {response.status_code} - {response.text}"
-            
-    except Exception as e:
-        return False, f"Connection failed: {str(e)}"
+            with col3:
+                # Refresh needs the sources recorded with the report
+                if st.button(f"Refresh {i+1}", key=f"refresh_{i}",
+                             disabled=not (research.get('sources') and check_api_keys()),
+                             help="Re-check the report's sources and update only the affected sections"):
+                    st.session_state.refresh_requested = len(st.session_state.research_history) - 1 - i
+                    st.rerun()
 
 # Main research process
-if st.button("Start Research", disabled=not (check_api_keys() and research_topic)):
+start_requested = st.button("Start Research", disabled=not (check_api_keys() and research_topic))
+resuming = st.session_state.resume_requested
+st.session_state.resume_requested = False
+if start_requested or resuming:
     if not check_api_keys():
         st.warning(f"Please enter your {st.session_state.selected_provider} API key in the sidebar.")
     elif not research_topic:
         st.warning("Please enter a research topic.")
     else:
-        try:
-            # Test Groq connection if using Groq
-            if st.session_state.selected_provider == "Groq":
-                with st.spinner("Testing Groq API connection..."):
-                    success, message = test_groq_connection()
-                    if not success:
-                        st.error(f"Groq API test failed: {message}")
-                        st.stop()
-                    else:
-                        st.success("Groq API connection successful!")
-            
-            start_time = time.time()
-            
-            # Get research parameters
-            params = st.session_state.get('research_params', {
-                'max_urls': 10
-            })
-            
-            # Create the research tool
-            research_tool = StructuredTool.from_function(deep_research_tool)
-            
-            # Create the appropriate LLM based on selected provider
-            if st.session_state.selected_provider == "OpenAI":
-                llm = ChatOpenAI(
-                    model="gpt-4",
-                    temperature=0.1,
-                    openai_api_key=st.session_state.openai_api_key
-                )
-            elif st.session_state.selected_provider == "Groq":
-                llm = ChatGroq(
-                    model="llama3-8b-8192",
-                    temperature=0.1,
-                    groq_api_key=st.session_state.groq_api_key
-                )
-            
-            with st.spinner("Creating research agents..."):
-                # Create the researcher agent
-                researcher = Agent(
-                    role='Research Analyst',
-                    goal='Conduct thorough research on the given topic using available research tools',
-                    backstory="""You are a skilled research analyst who specializes in gathering and analyzing information from multiple sources. 
-                    You have access to powerful research tools and you ALWAYS use them to gather current, accurate information. 
-                    You never rely solely on your existing knowledge - you actively search for and verify information using your research tools.
-                    Your expertise lies in finding relevant sources, extracting key insights, and synthesizing information into comprehensive reports.
-                    You are thorough, methodical, and always base your conclusions on actual research findings.""",
-                    verbose=True,
-                    allow_delegation=False,
-                    tools=[research_tool],
-                    llm=llm
-                )
-
-                # Create the writer agent
-                writer = Agent(
-                    role='Content Writer',
-                    goal='Create comprehensive and well-structured research reports',
-                    backstory="""You are a skilled content writer who specializes in creating 
-                    clear, comprehensive, and engaging research reports. You have the ability to 
-                    synthesize complex information into easily digestible content.""",
-                    verbose=True,
-                    allow_delegation=False,
-                    llm=llm
-                )
-
-            with st.spinner("Creating research tasks..."):
-                # Create the research task
-                research_task = Task(
-                    description=f"""IMPORTANT: You MUST use the deep_research_tool to perform actual research on the topic: {research_topic}
-
-                    CRITICAL INSTRUCTIONS:
-                    1. FIRST, call the deep_research_tool with these exact parameters:
-                       - query: "{research_topic}"
-                       - max_depth: {params['max_depth']}
-                       - time_limit: {params['time_limit']}
-                       - max_urls: {params['max_urls']}
-                    
-                    2. THEN, analyze the research results and provide:
-                       - Key findings from the actual research
-                       - Important insights and takeaways
-                       - Relevant data or statistics found
-                       - Summary of the main points discovered
-                    
-                    3. DO NOT just write generic statements - use the actual research data
-                    4. Reference specific information found during the research
-                    5. Be thorough and provide detailed analysis based on real findings
-                    
-                    Remember: You have access to the deep_research_tool - USE IT to gather real information!""",
-                    agent=researcher,
-                    expected_output="A comprehensive research report with detailed findings and insights based on actual web research."
-                )
-
-                # Create the writing task
-                writing_task = Task(
-                    description=f"""Based on the research findings about {research_topic}, create a 
-                    comprehensive and well-structured research report.
-                    
-                    The report should include:
-                    1. Executive Summary
-                    2. Key Findings
-                    3. Detailed Analysis
-                    4. Conclusions and Recommendations
-                    5. References
-                    
-                    Make sure the content is clear, professional, and well-organized.""",
-                    agent=writer,
-                    expected_output="A professional research report with proper structure and formatting."
-                )
-
-            # Show estimated time based on research mode
-            mode = params.get('research_mode', 'Standard Research (2-4 min)')
-            if 'Fast' in mode:
-                estimated_time = "1-2 minutes"
-                st.info("⚡ Fast Research Mode: Estimated completion time 1-2 minutes")
-            elif 'Standard' in mode:
-                estimated_time = "2-4 minutes"
-                st.info("⚖️ Standard Research Mode: Estimated completion time 2-4 minutes")
+        # Get research parameters
+        params = st.session_state.get('research_params', {
+            'max_urls': 10
+        })
+        # Retry continues the failed run; Start always begins a new one
+        run_id = st.session_state.failed_run_id if resuming else new_run_id()
+        
+        job = {
+            "topic": research_topic,
+            "params": params,
+            "provider": st.session_state.selected_provider,
+            "api_keys": {
+                "OpenAI": st.session_state.openai_api_key,
+                "Groq": st.session_state.groq_api_key,
+                "Firecrawl": st.session_state.firecrawl_api_key
+            },
+            "routing": st.session_state.model_routing,
+            "use_cache": st.session_state.use_llm_cache,
+            "failover_enabled": st.session_state.failover_enabled,
+            "hedge_after": st.session_state.hedge_after,
+            "run_id": run_id,
+            "resume": resuming
+        }
+        
+        # Show the estimated time predicted for this provider and these parameters
+        mode = params.get('research_mode', 'Standard Research')
+        estimated_time = st.session_state.get('research_estimate', 'a few minutes')
+        mode_icons = {"Fast Research": "⚡", "Standard Research": "⚖️", "Target Deadline": "🎯"}
+        st.info(f"{mode_icons.get(mode, '🔍')} {mode} Mode: Estimated completion time {estimated_time}")
+        
+        # Set up real-time progress tracking
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        
+        def on_progress(event):
+            if event.get('progress') is not None:
+                progress_bar.progress(event['progress'])
+            if event.get('level') == 'activity':
+                status_text.text(event['message'])
+                if st.session_state.get('debug_mode', False):
+                    st.write(f"🔍 {event['message']}")
+            elif event.get('level') == 'warning':
+                st.warning(event['message'])
+            elif event.get('level') == 'error':
+                st.error(event['message'])
+            elif event.get('level') == 'success':
+                st.success(event['message'])
             else:
-                estimated_time = "4-6 minutes"
-                st.info("🔍 Deep Research Mode: Estimated completion time 4-6 minutes")
-
+                st.info(event['message'])
+        
+        try:
             with st.spinner(f"Running the research crew... (Estimated: {estimated_time})"):
-                # Create the crew
-                crew = Crew(
-                    agents=[researcher, writer],
-                    tasks=[research_task, writing_task],
-                    verbose=True
-                )
-
-                # Run the crew
-                result = crew.kickoff()
+                service_url = st.session_state.research_service_url
+                if service_url:
+                    job_id = submit_job(service_url, job)
+                    for event_name, data in iter_job_events(service_url, job_id):
+                        if event_name == "progress":
+                            on_progress(data)
+                    job_status = get_job(service_url, job_id)
+                    if job_status["status"] != "completed":
+                        raise RuntimeError(job_status.get("error") or "Research job failed")
+                    export = job_status["result"]
+                else:
+                    export = run_research_job(job, on_progress, provider_health=st.session_state.provider_health)
             
-            # Calculate research metrics
-            end_time = time.time()
-            research_time = end_time - start_time
+            progress_bar.empty()
+            status_text.empty()
+            st.session_state.failed_run_id = None
+            
+            result = export['report']
+            research_time = export['metrics']['research_time']
+            route_metrics = export['metrics']['routes']
+            pool_info = export['metrics'].get('provider_pool')
             
             # Display research metrics
             st.markdown("### 📊 Research Metrics")
@@ -644,6 +408,43 @@ if st.button("Start Research", disabled=not (check_api_keys() and research_topic
             with col4:
                 st.metric("Max Sources", params['max_urls'])
             
+            # Per-route latency and cost, for tuning the routing policy
+            with st.expander("🧭 Model Routes"):
+                for route in route_metrics:
+                    if route['accepted']:
+                        status = "✅ accepted"
+                    elif route.get('final'):
+                        status = f"⚠️ used despite failed validation ({'; '.join(route['problems'])})"
+                    else:
+                        status = f"↗️ escalated ({'; '.join(route['problems'])})"
+                    st.write(
+                        f"**{route['task']}** → {route['model']} ({route['tier']}): "
+                        f"{route['latency']:.1f}s, {route['prompt_tokens'] + route['completion_tokens']} tokens, "
+                        f"${route['cost']:.4f} — {status}"
+                    )
+                    # With failover, the tokens and cost are split across the providers that ran
+                    used = [p for p in route.get('providers', []) if p['prompt_tokens'] or p['completion_tokens']]
+                    if len(used) > 1:
+                        st.caption(" · ".join(
+                            f"{p['provider']} {p['model']}: {p['answers']} answers, "
+                            f"{p['prompt_tokens'] + p['completion_tokens']} tokens, ${p['cost']:.4f}"
+                            for p in used
+                        ))
+                if pool_info:
+                    pool_stats = pool_info['stats']
+                    st.caption(
+                        f"LLM calls: {pool_stats['calls']} · hedged: {pool_stats['hedged']} · "
+                        f"failovers: {pool_stats['failovers']} · answered by backup: {pool_stats['backup_wins']}"
+                    )
+                    for health in pool_info['providers']:
+                        latency = " / ".join(
+                            f"{health[p]:.1f}s" if health[p] is not None else "–" for p in ("p50", "p95", "p99")
+                        )
+                        st.write(
+                            f"{'🟢' if health['healthy'] else '🔴'} **{health['provider']}**: "
+                            f"p50/p95/p99 {latency}, {health['successes']} ok, {health['failures']} failed"
+                        )
+            
             # Display the enhanced report
             st.markdown("## 📋 Enhanced Research Report")
             st.markdown(result)
@@ -657,8 +458,11 @@ if st.button("Start Research", disabled=not (check_api_keys() and research_topic
                     "research_time": research_time,
                     "template": "Custom",
                     "max_depth": params['max_depth'],
-                    "max_urls": params['max_urls']
-                }
+                    "max_urls": params['max_urls'],
+                    "routes": route_metrics
+                },
+                "params": params,
+                "sources": export.get('sources', [])
             })
             
             # Export options
@@ -703,21 +507,10 @@ if st.button("Start Research", disabled=not (check_api_keys() and research_topic
                 )
             
             with export_col3:
-                # Generate JSON export with metadata
-                json_export = {
-                    "topic": research_topic,
-                    "timestamp": datetime.now().isoformat(),
-                    "template": "Custom",
-                    "metrics": {
-                        "research_time": research_time,
-                        "max_depth": params['max_depth'],
-                        "max_urls": params['max_urls']
-                    },
-                    "report": result
-                }
+                # The pipeline already returns the JSON export with metadata
                 st.download_button(
                     "📊 Download JSON",
-                    json.dumps(json_export, indent=2),
+                    json.dumps(export, indent=2),
                     file_name=f"{research_topic.replace(' ', '_')}_report.json",
                     mime="application/json"
                 )
@@ -726,10 +519,101 @@ if st.button("Start Research", disabled=not (check_api_keys() and research_topic
             st.error(f"An error occurred: {str(e)}")
             if st.session_state.get('debug_mode', False):
                 st.exception(e)
-            
-            # Add retry button
-            if st.button("🔄 Retry Research"):
-                st.rerun()
+            st.session_state.failed_run_id = run_id
+
+# Incremental refresh of a report from the research history
+if st.session_state.refresh_requested is not None:
+    previous = st.session_state.research_history[st.session_state.refresh_requested]
+    st.session_state.refresh_requested = None
+    st.markdown("---")
+    st.markdown(f"## 🔄 Refreshing: {previous['topic']}")
+    
+    refresh_job = {
+        "topic": previous['topic'],
+        "params": previous['params'],
+        "provider": st.session_state.selected_provider,
+        "api_keys": {
+            "OpenAI": st.session_state.openai_api_key,
+            "Groq": st.session_state.groq_api_key,
+            "Firecrawl": st.session_state.firecrawl_api_key
+        },
+        "routing": st.session_state.model_routing,
+        "use_cache": st.session_state.use_llm_cache,
+        "failover_enabled": st.session_state.failover_enabled,
+        "hedge_after": st.session_state.hedge_after
+    }
+    
+    try:
+        with st.spinner("Checking sources and updating the report..."):
+            service_url = st.session_state.research_service_url
+            if service_url:
+                refresh_job["previous"] = {"report": previous['report'], "sources": previous.get('sources', [])}
+                job_id = submit_job(service_url, refresh_job)
+                for event_name, data in iter_job_events(service_url, job_id):
+                    if event_name == "progress":
+                        st.caption(data['message'])
+                job_status = get_job(service_url, job_id)
+                if job_status["status"] != "completed":
+                    raise RuntimeError(job_status.get("error") or "Refresh job failed")
+                refreshed = job_status["result"]
+            else:
+                refreshed = run_refresh_job(
+                    refresh_job, previous,
+                    on_progress=lambda event: st.caption(event['message']),
+                    provider_health=st.session_state.provider_health
+                )
+        
+        changes = refreshed['metrics']['refresh']
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Refresh Time", f"{refreshed['metrics']['research_time']:.1f}s")
+        with col2:
+            st.metric("New Sources", changes['new'])
+        with col3:
+            st.metric("Changed Sources", changes['changed'])
+        with col4:
+            st.metric("Removed Sources", changes['gone'])
+        
+        if refreshed['diff']:
+            with st.expander("🔀 Changes since the previous version", expanded=True):
+                st.code(refreshed['diff'], language="diff")
+        else:
+            st.success("✅ No source changes - the report is up to date.")
+        
+        st.markdown("## 📋 Refreshed Research Report")
+        st.markdown(refreshed['report'])
+        
+        st.session_state.research_history.append({
+            "topic": previous['topic'],
+            "timestamp": datetime.now(),
+            "report": refreshed['report'],
+            "metrics": {
+                "research_time": refreshed['metrics']['research_time'],
+                "template": "Refresh",
+                "max_depth": previous['params']['max_depth'],
+                "max_urls": previous['params']['max_urls'],
+                "routes": refreshed['metrics']['routes']
+            },
+            "params": previous['params'],
+            "sources": refreshed['sources']
+        })
+        
+        st.download_button(
+            "📄 Download Markdown",
+            refreshed['report'],
+            file_name=f"{previous['topic'].replace(' ', '_')}_report.md",
+            mime="text/markdown"
+        )
+    except Exception as e:
+        st.error(f"An error occurred while refreshing: {str(e)}")
+        if st.session_state.get('debug_mode', False):
+            st.exception(e)
+
+# Retry resumes the failed run from its last completed stage
+if st.session_state.failed_run_id:
+    if st.button("🔄 Retry Research"):
+        st.session_state.resume_requested = True
+        st.rerun()
 
 # Display current research if available
 if st.session_state.current_research:
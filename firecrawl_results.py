@@ -0,0 +1,111 @@
+"""
+Compact, memory-bounded view of Firecrawl deep research results.
+Sources become slotted records with truncated text and activities are
+reduced to a count, so the raw response can be dropped as soon as the
+research tool has read it.
+"""
+
+from typing import Dict, Any, List, Optional
+
+MAX_DESCRIPTION_CHARS = 500
+MAX_CONTENT_CHARS = 4000
+MAX_ANALYSIS_CHARS = 20000
+
+
+class SourceRecord:
+    """One Firecrawl source with bounded text."""
+
+    __slots__ = ("url", "title", "description", "content", "content_length")
+
+    def __init__(self, url: str, title: str, description: str, content: str, content_length: int):
+        self.url = url
+        self.title = title
+        self.description = description
+        self.content = content
+        self.content_length = content_length
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Lets records stand in for source dicts (e.g. in source deduplication)
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    @classmethod
+    def from_source(cls, source: Dict[str, Any]) -> "SourceRecord":
+        content = source.get('content') or source.get('markdown') or ''
+        return cls(
+            url=source.get('url') or '',
+            title=source.get('title') or 'Untitled',
+            description=(source.get('description') or 'No description')[:MAX_DESCRIPTION_CHARS],
+            content=content[:MAX_CONTENT_CHARS],
+            content_length=len(content),
+        )
+
+
+class CompactResearchResult:
+    """Firecrawl deep research response reduced to what the research tool uses."""
+
+    __slots__ = ("final_analysis", "sources", "source_count", "activity_count")
+
+    def __init__(self, final_analysis: str, sources: List[SourceRecord], activity_count: int):
+        self.final_analysis = final_analysis
+        self.sources = sources
+        self.source_count = len(sources)
+        self.activity_count = activity_count
+
+    @classmethod
+    def from_response(cls, results: Any) -> Optional["CompactResearchResult"]:
+        """Build a compact result, or None if the response carries no data."""
+        if not (results and results.get('success') and results.get('data')):
+            return None
+        research_data = results['data']
+        sources = [
+            SourceRecord.from_source(source)
+            for source in research_data.get('sources') or []
+            if isinstance(source, dict)
+        ]
+        return cls(
+            final_analysis=(research_data.get('finalAnalysis') or 'No analysis available')[:MAX_ANALYSIS_CHARS],
+            sources=sources,
+            activity_count=len(research_data.get('activities') or []),
+        )
+
+
+def format_firecrawl_results(query: str, max_depth: int, time_limit: int, max_urls: int,
+                             result: CompactResearchResult, dedup_summary: str) -> str:
+    """Render a compact result as the research tool's output."""
+    # Format sources for display
+    sources_info = []
+    for i, source in enumerate(result.sources[:5]):  # Show first 5 sources
+        sources_info.append(f"**{i+1}. {source.title}**\n   URL: {source.url or 'No URL'}\n   {source.description[:100]}...")
+
+    return f"""
+# FIRECRAWL DEEP RESEARCH RESULTS FOR: {query}
+
+## Research Parameters:
+- **Query**: {query}
+- **Max Depth**: {max_depth}
+- **Max URLs**: {max_urls}
+- **Time Limit**: {time_limit} seconds
+
+## Final Analysis:
+{result.final_analysis}
+
+## Key Sources Analyzed:
+{chr(10).join(sources_info) if sources_info else 'No sources available'}
+
+## Research Quality:
+- ✅ Professional deep research
+- ✅ {len(result.sources)} sources analyzed
+- ✅ {dedup_summary}
+- ✅ AI-powered content synthesis
+- ✅ Real-time progress tracking
+- ✅ High-quality content filtering
+
+## Research Activities:
+- {result.activity_count} research steps completed
+- Advanced web crawling and analysis
+- Content synthesis and summarization
+
+## Note:
+This research was conducted using Firecrawl's advanced deep research technology.
+"""
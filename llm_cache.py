@@ -0,0 +1,158 @@
+"""
+Persistent on-disk cache for LLM completions.
+Wraps the CrewAI LLM an agent calls, so a repeated request (same model,
+parameters, stop words and messages) is answered from disk; entries are
+evicted least-recently-used once the cache grows past its size bound.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from crewai import BaseLLM
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "llm_cache.sqlite")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """Hash of the serialized messages plus the model and its parameters."""
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+class DiskLLMCache:
+    """SQLite-backed completion store with size-bounded LRU eviction."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = path or os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS completions (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON completions(last_access)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Streamlit runs each session in its own thread, so connections are not shared
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def update(self, key: str, value: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO completions (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), time.time()),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = conn.execute("SELECT key, size FROM completions ORDER BY last_access ASC").fetchall()
+        stale = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            stale.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM completions WHERE key = ?", stale)
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM completions")
+
+
+_default_cache: Optional[DiskLLMCache] = None
+
+
+def get_llm_cache() -> DiskLLMCache:
+    """Shared process-wide cache instance."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DiskLLMCache()
+    return _default_cache
+
+
+class CachedLLM(BaseLLM):
+    """
+    CrewAI LLM that answers repeated text completions from a DiskLLMCache.
+
+    CrewAI uses BaseLLM instances as-is, so this is the layer its agents
+    actually call. Calls with tools are passed straight through, since
+    their results come from running functions.
+    """
+
+    def __init__(self, llm: BaseLLM, cache: Optional[DiskLLMCache] = None):
+        super().__init__(model=llm.model, temperature=llm.temperature)
+        self.llm = llm
+        self.cache = cache or get_llm_cache()
+        self.hits = 0
+        self.misses = 0
+
+    def _llm_string(self) -> str:
+        return json.dumps({"model": self.model, "temperature": self.temperature, "stop": sorted(self.stop or [])})
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> Union[str, Any]:
+        # Agent executors set stop words on the LLM they were given
+        self.llm.stop = self.stop
+        if tools or available_functions:
+            return self.llm.call(messages, tools, callbacks, available_functions)
+
+        key = cache_key(json.dumps(messages, sort_keys=True, default=str), self._llm_string())
+        cached = self.cache.lookup(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        result = self.llm.call(messages, callbacks=callbacks)
+        if isinstance(result, str) and result:
+            self.cache.update(key, result)
+        return result
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def supports_function_calling(self) -> bool:
+        return self.llm.supports_function_calling()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
@@ -0,0 +1,200 @@
+"""
+Per-task model routing and cascading for the research crew.
+Each task picks a model tier; the cascade policy tries the fast model
+first and escalates to the strong one only if output validation fails.
+"""
+
+import time
+from typing import Dict, Any, List, Callable, Optional
+
+# Model tiers per provider
+MODEL_CATALOG = {
+    "OpenAI": {"fast": "gpt-3.5-turbo", "strong": "gpt-4"},
+    "Groq": {"fast": "llama3-8b-8192", "strong": "llama3-70b-8192"},
+}
+
+# Approximate USD price per 1K tokens: (prompt, completion)
+MODEL_PRICING = {
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+    "gpt-4": (0.03, 0.06),
+    "llama3-8b-8192": (0.00005, 0.00008),
+    "llama3-70b-8192": (0.00059, 0.00079),
+}
+
+POLICY_FAST = "Fast"
+POLICY_STRONG = "Strong"
+POLICY_CASCADE = "Cascade (fast → strong)"
+ROUTING_POLICIES = [POLICY_FAST, POLICY_STRONG, POLICY_CASCADE]
+
+# LiteLLM provider prefixes for the CrewAI LLM model strings
+LITELLM_PROVIDERS = {"OpenAI": "openai", "Groq": "groq"}
+
+DEFAULT_ROUTING = {
+    "research": POLICY_FAST,
+    "writing": POLICY_CASCADE,
+}
+
+REPORT_SECTIONS = ("Executive Summary", "References")
+MIN_REPORT_CHARS = 800
+MIN_RESEARCH_CHARS = 200
+
+
+def policy_tiers(policy: str) -> List[str]:
+    """Model tiers to try, in order, for a routing policy."""
+    if policy == POLICY_CASCADE:
+        return ["fast", "strong"]
+    if policy == POLICY_FAST:
+        return ["fast"]
+    return ["strong"]
+
+
+def build_llm(provider: str, model: str, api_key: str, use_cache: bool = False):
+    """
+    Create the CrewAI LLM for a provider/model pair.
+
+    CrewAI rebuilds any other client (e.g. LangChain's) as its own LiteLLM
+    LLM, so the cache wraps the CrewAI LLM the agents actually call.
+    """
+    if provider not in LITELLM_PROVIDERS:
+        raise ValueError(f"Unknown provider: {provider}")
+    from crewai import LLM
+    llm = LLM(model=f"{LITELLM_PROVIDERS[provider]}/{model}", temperature=0.1, api_key=api_key)
+    if use_cache:
+        from llm_cache import CachedLLM
+        llm = CachedLLM(llm)
+    return llm
+
+
+def validate_report(text: str) -> List[str]:
+    """Return the reasons a writer output is unacceptable (empty if it passes)."""
+    problems = []
+    if len(text.strip()) < MIN_REPORT_CHARS:
+        problems.append(f"too short ({len(text.strip())} chars)")
+    lowered = text.lower()
+    for section in REPORT_SECTIONS:
+        if section.lower() not in lowered:
+            problems.append(f"missing '{section}' section")
+    return problems
+
+
+def validate_research(text: str) -> List[str]:
+    """Return the reasons a researcher output is unacceptable (empty if it passes)."""
+    if len(text.strip()) < MIN_RESEARCH_CHARS:
+        return [f"too short ({len(text.strip())} chars)"]
+    return []
+
+
+def extract_usage(output: Any) -> Dict[str, int]:
+    """Pull token usage out of a CrewAI kickoff result, if it reports any."""
+    usage = getattr(output, "token_usage", None)
+    if usage is None:
+        return {"prompt_tokens": 0, "completion_tokens": 0}
+    if not isinstance(usage, dict):
+        usage = usage.model_dump() if hasattr(usage, "model_dump") else vars(usage)
+    return {
+        "prompt_tokens": int(usage.get("prompt_tokens", 0) or 0),
+        "completion_tokens": int(usage.get("completion_tokens", 0) or 0),
+    }
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a call given its token usage."""
+    prompt_price, completion_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+
+
+def pool_usage(llm: Any, tier: str) -> List[Dict[str, Any]]:
+    """Per-provider answers, tokens and cost recorded by a HedgedLLM."""
+    providers = []
+    for name, usage in llm.usage.items():
+        model = MODEL_CATALOG[name][tier]
+        providers.append({
+            "provider": name,
+            "model": model,
+            "answers": llm.answers[name],
+            "prompt_tokens": usage["prompt_tokens"],
+            "completion_tokens": usage["completion_tokens"],
+            "cost": estimate_cost(model, usage["prompt_tokens"], usage["completion_tokens"]),
+        })
+    return providers
+
+
+def run_routed(
+    task_name: str,
+    policy: str,
+    provider: str,
+    api_key: str,
+    run_fn: Callable[[Any], Any],
+    validator: Optional[Callable[[str], List[str]]] = None,
+    route_metrics: Optional[List[Dict[str, Any]]] = None,
+    use_cache: bool = False,
+    pool: Optional[Any] = None,
+    pool_keys: Optional[Dict[str, str]] = None,
+) -> Any:
+    """
+    Run a task on the model(s) chosen by its routing policy.
+
+    `run_fn` receives the LLM client and returns the task output. Under the
+    cascade policy a failed validation escalates to the next tier; the last
+    tier's output is always returned. One metrics entry is recorded per attempt:
+    `accepted` is whether it passed validation, `final` whether it was used.
+
+    With a `ProviderPool`, each LLM call is hedged and failed over across
+    the pool's providers (`pool_keys` maps provider name to API key). The
+    entry then names the provider that answered most calls and adds a
+    per-provider breakdown in `providers`, which the tokens and cost sum.
+    """
+    tiers = policy_tiers(policy)
+    output = None
+    for attempt, tier in enumerate(tiers):
+        model = MODEL_CATALOG[provider][tier]
+        if pool is not None:
+            from provider_pool import build_hedged_llm
+            llm = build_hedged_llm(pool, {
+                name: build_llm(name, MODEL_CATALOG[name][tier], pool_keys[name], use_cache=use_cache)
+                for name in pool.providers
+            })
+        else:
+            llm = build_llm(provider, model, api_key, use_cache=use_cache)
+
+        start_time = time.time()
+        output = run_fn(llm)
+        latency = time.time() - start_time
+
+        usage = extract_usage(output)
+        route_provider = provider
+        providers = None
+        if pool is not None:
+            # Price each provider's tokens with its own model; the backup may have answered
+            providers = pool_usage(llm, tier)
+            if any(entry["answers"] for entry in providers):
+                route_provider = max(providers, key=lambda entry: entry["answers"])["provider"]
+            model = MODEL_CATALOG[route_provider][tier]
+            usage = {key: sum(entry[key] for entry in providers) for key in ("prompt_tokens", "completion_tokens")}
+            cost = sum(entry["cost"] for entry in providers)
+        else:
+            cost = estimate_cost(model, usage["prompt_tokens"], usage["completion_tokens"])
+        problems = validator(str(output)) if validator else []
+        is_last = attempt == len(tiers) - 1
+        if route_metrics is not None:
+            entry = {
+                "task": task_name,
+                "provider": route_provider,
+                "policy": policy,
+                "tier": tier,
+                "model": model,
+                "latency": latency,
+                "prompt_tokens": usage["prompt_tokens"],
+                "completion_tokens": usage["completion_tokens"],
+                "cost": cost,
+                "accepted": not problems,
+                "final": not problems or is_last,
+                "problems": problems,
+            }
+            if providers is not None:
+                entry["providers"] = providers
+                entry["hedged_calls"] = llm.hedged_calls
+            route_metrics.append(entry)
+        if not problems or is_last:
+            break
+    return output
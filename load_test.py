@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Load test for the Streamlit app against local mock backends.
+Drives N concurrent headless sessions of deep_research_crewai.py with
+Streamlit's AppTest inside one process (like one app server), with the
+OpenAI and Firecrawl APIs replaced by a mock server in a child process, and
+reports run latency, error rate, CPU and memory per session at each
+concurrency level. A level fails if a mock backend was never reached.
+
+    python load_test.py [--levels 1,2,4,8] [--runs-per-session 1]
+                        [--llm-latency 0.5] [--firecrawl-latency 2.0] [--json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import random
+import re
+import resource
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+from percentiles import percentile
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "deep_research_crewai.py")
+RUN_TIMEOUT = 600
+SAMPLE_INTERVAL = 0.2
+
+MOCK_SOURCES = 5
+MOCK_CONTENT_CHARS = 8000
+
+
+def _words(rng: random.Random, count: int) -> str:
+    vocabulary = ["market", "growth", "analysis", "data", "trend", "policy", "research",
+                  "adoption", "energy", "model", "risk", "cost", "impact", "study", "report"]
+    return " ".join(rng.choice(vocabulary) for _ in range(count))
+
+
+def mock_research_notes(rng: random.Random) -> str:
+    return "## Key Findings\n" + "\n".join(f"- Finding {i + 1}: {_words(rng, 25)}" for i in range(6))
+
+
+def mock_source_url(base: str, index: int) -> str:
+    # Served by the mock server, so fingerprinting sources stays off the network
+    return f"{base}/source/{index}"
+
+
+def mock_source_page(index: int) -> bytes:
+    rng = random.Random(index)
+    return (f"<html><head><title>Article {index}</title></head>"
+            f"<body><p>{_words(rng, MOCK_CONTENT_CHARS // 7)}</p></body></html>").encode("utf-8")
+
+
+def mock_report(rng: random.Random, base: str) -> str:
+    # Passes validate_report so the writer cascade does not escalate
+    sections = ["Executive Summary", "Key Findings", "Analysis", "Conclusions"]
+    body = "\n\n".join(f"## {name}\n{_words(rng, 80)}" for name in sections)
+    references = "\n".join(f"{i + 1}. {mock_source_url(base, i)}" for i in range(MOCK_SOURCES))
+    return f"# Research Report\n\n{body}\n\n## References\n{references}\n"
+
+
+def mock_chat_content(body: Dict[str, Any], rng: random.Random, base: str) -> Dict[str, Any]:
+    """Pick the mock assistant message for a chat completion request."""
+    messages = body.get("messages") or []
+    text = "\n".join(str(m.get("content") or "") for m in messages)
+
+    # Native function calling: call the first tool once, then answer
+    if body.get("tools"):
+        if not any(m.get("role") == "tool" for m in messages):
+            tool = body["tools"][0]["function"]
+            arguments = {"query": "load test topic", "max_depth": 1, "time_limit": 60, "max_urls": MOCK_SOURCES}
+            return {"role": "assistant", "content": None, "tool_calls": [{
+                "id": f"call_{uuid.uuid4().hex[:12]}", "type": "function",
+                "function": {"name": tool["name"], "arguments": json.dumps(arguments)},
+            }]}
+        return {"role": "assistant", "content": mock_research_notes(rng)}
+
+    # Text ReAct prompts as used by CrewAI agents
+    tool_match = re.search(r"Tool Name:\s*([\w\-]+)", text)
+    if tool_match and "Observation:" not in text:
+        arguments = {"query": "load test topic", "max_depth": 1, "time_limit": 60, "max_urls": MOCK_SOURCES}
+        content = (f"Thought: I should research this topic with the available tool.\n"
+                   f"Action: {tool_match.group(1)}\nAction Input: {json.dumps(arguments)}")
+    elif tool_match:
+        content = f"Thought: I now know the final answer\nFinal Answer: {mock_research_notes(rng)}"
+    else:
+        content = f"Thought: I now can give a great answer\nFinal Answer: {mock_report(rng, base)}"
+    return {"role": "assistant", "content": content}
+
+
+def mock_deep_research_result(rng: random.Random, base: str) -> Dict[str, Any]:
+    sources = [
+        {"url": mock_source_url(base, i), "title": f"Article {i}",
+         "description": _words(rng, 40), "content": _words(rng, MOCK_CONTENT_CHARS // 7)}
+        for i in range(MOCK_SOURCES)
+    ]
+    activities = [
+        {"type": "search", "status": "complete", "message": f"Searching step {i}", "depth": 1,
+         "timestamp": "2024-01-01T00:00:00Z"}
+        for i in range(MOCK_SOURCES * 2)
+    ]
+    data = {"finalAnalysis": _words(rng, 600), "sources": sources, "activities": activities}
+    return {"success": True, "status": "completed", "data": data, **data}
+
+
+class MockBackendHandler(BaseHTTPRequestHandler):
+    """OpenAI chat completions, Firecrawl deep research and source pages, with simulated latency."""
+
+    server_version = "MockBackends/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds * random.uniform(0.8, 1.2))
+
+    def do_POST(self):
+        body = self._read_json()
+        rng = random.Random()
+        if self.path.rstrip("/").endswith("/chat/completions"):
+            self._sleep(self.server.llm_latency)
+            self.server.count("llm_calls")
+            message = mock_chat_content(body, rng, self.base_url)
+            usage = {"prompt_tokens": 800, "completion_tokens": 400, "total_tokens": 1200}
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+            if body.get("stream"):
+                self._send_stream(completion_id, body.get("model", "mock"), message, usage)
+                return
+            self._send_json(200, {
+                "id": completion_id, "object": "chat.completion", "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [{"index": 0, "message": message,
+                             "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"}],
+                "usage": usage,
+            })
+        elif "deep-research" in self.path:
+            self.server.count("firecrawl_jobs")
+            self._send_json(200, {"success": True, "id": uuid.uuid4().hex})
+        else:
+            self._send_json(404, {"success": False, "error": f"Unknown endpoint {self.path}"})
+
+    def do_GET(self):
+        if self.path == "/_counters":
+            with self.server._lock:
+                self._send_json(200, dict(self.server.counters))
+        elif "deep-research/" in self.path:
+            self._sleep(self.server.firecrawl_latency)
+            self._send_json(200, mock_deep_research_result(random.Random(), self.base_url))
+        elif re.fullmatch(r"/source/\d+", self.path):
+            self.server.count("source_fetches")
+            page = mock_source_page(int(self.path.rsplit("/", 1)[-1]))
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+        else:
+            self._send_json(404, {"success": False, "error": f"Unknown endpoint {self.path}"})
+
+    def _send_stream(self, completion_id: str, model: str, message: Dict[str, Any],
+                     usage: Dict[str, int]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        chunks = [
+            {"index": 0, "delta": {"role": "assistant", **{k: v for k, v in message.items() if k != "role"}},
+             "finish_reason": None},
+            {"index": 0, "delta": {}, "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"},
+        ]
+        for choice in chunks:
+            chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [choice]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        final = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                 "model": model, "choices": [], "usage": usage}
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+
+
+class MockBackendServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, llm_latency: float, firecrawl_latency: float):
+        super().__init__(address, MockBackendHandler)
+        self.llm_latency = llm_latency
+        self.firecrawl_latency = firecrawl_latency
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+
+def _serve_mock_backends(llm_latency: float, firecrawl_latency: float, conn) -> None:
+    server = MockBackendServer(("127.0.0.1", 0), llm_latency, firecrawl_latency)
+    conn.send(server.server_address)
+    conn.close()
+    server.serve_forever()
+
+
+class MockBackends:
+    """
+    Mock server running in a child process.
+
+    Keeps the mock's own CPU time and memory (building JSON and HTML
+    responses) out of the app process that the load test measures.
+    """
+
+    def __init__(self, llm_latency: float, firecrawl_latency: float):
+        context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_serve_mock_backends, args=(llm_latency, firecrawl_latency, child_conn), daemon=True
+        )
+        self.process.start()
+        self.server_address = parent_conn.recv()
+        parent_conn.close()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """Calls served so far, by kind (llm_calls, firecrawl_jobs, source_fetches)."""
+        with urllib.request.urlopen(f"{self.base_url}/_counters", timeout=10) as response:
+            return json.loads(response.read())
+
+    def shutdown(self) -> None:
+        self.process.terminate()
+        self.process.join()
+
+
+def start_mock_backends(llm_latency: float, firecrawl_latency: float) -> MockBackends:
+    return MockBackends(llm_latency, firecrawl_latency)
+
+
+def point_clients_at(server: MockBackends, work_dir: str) -> None:
+    """Route the SDKs to the mock server and keep run state out of the real caches."""
+    base = server.base_url
+    os.environ["OPENAI_API_BASE"] = f"{base}/v1"
+    os.environ["OPENAI_BASE_URL"] = f"{base}/v1"
+    os.environ["FIRECRAWL_API_URL"] = base
+    os.environ["LLM_CACHE_PATH"] = os.path.join(work_dir, "llm_cache.sqlite")
+    os.environ["RUN_CHECKPOINT_DIR"] = os.path.join(work_dir, "runs")
+    os.environ["RUN_METRICS_PATH"] = os.path.join(work_dir, "run_metrics.sqlite")
+    os.environ.pop("RESEARCH_SERVICE_URL", None)
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RssSampler:
+    """Tracks peak RSS in the background while a concurrency level runs."""
+
+    def __init__(self):
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            rss = current_rss()
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _by_label(widgets, label: str):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"Widget '{label}' not found")
+
+
+def run_session(session_index: int, runs: int) -> Dict[str, Any]:
+    """One user: enter keys and a topic, start research, repeat `runs` times."""
+    from streamlit.testing.v1 import AppTest
+    from research_tools import RESEARCH_ERROR_HEADINGS
+
+    app = AppTest.from_file(APP_FILE, default_timeout=RUN_TIMEOUT)
+    app.session_state["openai_api_key"] = "sk-mock"
+    app.session_state["firecrawl_api_key"] = "fc-mock"
+    app.session_state["use_llm_cache"] = False
+    app.run()
+
+    latencies, errors = [], []
+    for run in range(runs):
+        # Unique topics so runs never resume each other's checkpoints
+        topic = f"load test session {session_index} run {run} {uuid.uuid4().hex[:8]}"
+        _by_label(app.text_input, "Enter your research topic:").input(topic)
+        app.run()
+        start = time.perf_counter()
+        try:
+            _by_label(app.button, "Start Research").click()
+            app.run()
+            failure = None
+            if app.exception:
+                failure = app.exception[0].message
+            elif app.session_state["failed_run_id"]:
+                failure = app.error[0].value if app.error else "run failed"
+            elif not any("Enhanced Research Report" in m.value for m in app.markdown):
+                failure = "no report rendered"
+            else:
+                # The crew still writes a report when the research tool failed, so look for its warning
+                tool_errors = [w.value for w in app.warning if any(h in w.value for h in RESEARCH_ERROR_HEADINGS)]
+                if tool_errors:
+                    failure = tool_errors[0]
+        except Exception as e:
+            failure = str(e)
+        latencies.append(time.perf_counter() - start)
+        if failure:
+            errors.append(failure)
+
+    history = app.session_state["research_history"] if "research_history" in app.session_state else []
+    return {"latencies": latencies, "errors": errors, "history_bytes": len(pickle.dumps(history))}
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_level(server: MockBackends, sessions: int, runs: int) -> Dict[str, Any]:
+    """Run `sessions` concurrent users and summarize the level."""
+    counters_before = server.counters
+    baseline_rss = current_rss()
+    cpu_before = _cpu_seconds()
+    started = time.perf_counter()
+    with RssSampler() as sampler, ThreadPoolExecutor(max_workers=sessions) as executor:
+        results = list(executor.map(lambda i: run_session(i, runs), range(sessions)))
+    wall = time.perf_counter() - started
+    cpu = _cpu_seconds() - cpu_before
+    counters_after = server.counters
+    backend_calls = {name: counters_after.get(name, 0) - counters_before.get(name, 0)
+                     for name in ("llm_calls", "firecrawl_jobs")}
+    # Runs that never reached a mock backend measured nothing, however clean they looked
+    unreached = [name for name, calls in backend_calls.items() if not calls]
+
+    latencies = [latency for result in results for latency in result["latencies"]]
+    errors = [error for result in results for error in result["errors"]]
+    memory = None
+    if baseline_rss is not None and sampler.peak is not None:
+        memory = max(0, sampler.peak - baseline_rss) / sessions / (1024 * 1024)
+    return {
+        "sessions": sessions,
+        "runs": len(latencies),
+        "errors": len(errors),
+        "error_rate": len(errors) / len(latencies) if latencies else 0.0,
+        "p50_seconds": percentile(latencies, 50),
+        "p99_seconds": percentile(latencies, 99),
+        "wall_seconds": wall,
+        "runs_per_minute": len(latencies) / wall * 60 if wall else 0.0,
+        "cpu_seconds_per_session": cpu / sessions,
+        "cpu_percent": cpu / wall * 100 if wall else 0.0,
+        "rss_mb_per_session": memory,
+        "history_kb_per_session": sum(r["history_bytes"] for r in results) / sessions / 1024,
+        "backend_calls": backend_calls,
+        "failed": bool(unreached),
+        "sample_errors": [f"mock backend never reached: {name}" for name in unreached] + sorted(set(errors))[:3],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the research app with concurrent headless sessions")
+    parser.add_argument("--levels", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--runs-per-session", type=int, default=1,
+                        help="Research runs per session (grows research_history)")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Mock LLM latency per call (seconds)")
+    parser.add_argument("--firecrawl-latency", type=float, default=2.0,
+                        help="Mock Firecrawl deep research latency (seconds)")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+    server = start_mock_backends(args.llm_latency, args.firecrawl_latency)
+    results = []
+    backend_calls = {}
+    with tempfile.TemporaryDirectory(prefix="research-load-") as work_dir:
+        point_clients_at(server, work_dir)
+        try:
+            for sessions in levels:
+                if not args.json:
+                    print(f"⏱️ Running {sessions} concurrent session(s)...")
+                results.append(run_level(server, sessions, args.runs_per_session))
+            backend_calls = server.counters
+        finally:
+            server.shutdown()
+    failed = any(r["failed"] for r in results)
+
+    if args.json:
+        print(json.dumps({"levels": results, "backend_calls": backend_calls}, indent=2))
+        sys.exit(1 if failed else 0)
+
+    def seconds(value):
+        return f"{value:.1f}s" if value is not None else "–"
+
+    print(f"\n📊 Load test ({args.runs_per_session} run(s) per session, "
+          f"mock LLM {args.llm_latency}s, mock Firecrawl {args.firecrawl_latency}s)")
+    print(f"{'Sessions':>8}{'Runs':>6}{'Errors':>8}{'p50':>8}{'p99':>8}{'Runs/min':>10}"
+          f"{'CPU/sess':>10}{'CPU %':>8}{'RSS/sess':>10}{'History':>10}")
+    for r in results:
+        memory = f"{r['rss_mb_per_session']:.1f}MB" if r['rss_mb_per_session'] is not None else "–"
+        print(f"{r['sessions']:>8}{r['runs']:>6}{r['error_rate']:>7.0%} {seconds(r['p50_seconds']):>8}"
+              f"{seconds(r['p99_seconds']):>8}{r['runs_per_minute']:>10.1f}{r['cpu_seconds_per_session']:>9.1f}s"
+              f"{r['cpu_percent']:>7.0f}%{memory:>10}{r['history_kb_per_session']:>8.1f}KB")
+    for r in results:
+        for error in r["sample_errors"]:
+            print(f"   ❌ [{r['sessions']} sessions] {error}")
+    print(f"\nBackend calls: {backend_calls}")
+    if failed:
+        print("❌ Load test failed: a mock backend was never reached, so the runs measured nothing")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""
+Nearest-rank percentiles.
+Shared by the provider pool's latency statistics, the completion-time
+model and the load test.
+"""
+
+from typing import Iterable, Optional
+
+
+def percentile(values: Iterable[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of `values`, or None if there are none."""
+    samples = sorted(values)
+    if not samples:
+        return None
+    index = min(len(samples) - 1, max(0, int(round(pct / 100 * (len(samples) - 1)))))
+    return samples[index]
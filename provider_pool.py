@@ -0,0 +1,253 @@
+"""
+Provider pool with hedged requests and automatic failover.
+A slow LLM call is re-sent to a second provider after a latency threshold
+and whichever answers first wins; errors fail over to the next healthy
+provider. Per-provider health and latency percentiles decide the order.
+"""
+
+import copy
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, List, Callable, Optional, TypeVar, Union
+
+from crewai import BaseLLM
+from crewai.agents.agent_builder.utilities.base_token_process import TokenProcess
+from crewai.utilities.token_counter_callback import TokenCalcHandler
+
+from percentiles import percentile
+
+T = TypeVar("T")
+
+DEFAULT_HEDGE_AFTER = 10.0
+MIN_HEDGE_AFTER = 2.0
+MIN_LATENCY_SAMPLES = 5
+MAX_CONSECUTIVE_FAILURES = 3
+FAILURE_COOLDOWN = 60.0
+
+
+class ProviderHealth:
+    """Rolling latency and error statistics for one provider."""
+
+    def __init__(self, name: str, window: int = 200):
+        self.name = name
+        self.latencies = deque(maxlen=window)
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_failure = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+            self.successes += 1
+            self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_failure = time.time()
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = list(self.latencies)
+        return percentile(samples, pct)
+
+    @property
+    def healthy(self) -> bool:
+        # Tripped providers get another chance once the cooldown has passed
+        if self.consecutive_failures < MAX_CONSECUTIVE_FAILURES:
+            return True
+        return time.time() - self.last_failure > FAILURE_COOLDOWN
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "provider": self.name,
+            "healthy": self.healthy,
+            "successes": self.successes,
+            "failures": self.failures,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class ProviderPool:
+    """Routes calls across configured providers with hedging and failover."""
+
+    def __init__(
+        self,
+        providers: List[str],
+        health: Optional[Dict[str, ProviderHealth]] = None,
+        hedge_after: Optional[float] = None,
+        primary: Optional[str] = None,
+    ):
+        if not providers:
+            raise ValueError("ProviderPool needs at least one provider")
+        self.providers = list(providers)
+        self.health = health if health is not None else {}
+        for name in self.providers:
+            self.health.setdefault(name, ProviderHealth(name))
+        self.hedge_after = hedge_after
+        self.primary = primary if primary in self.providers else self.providers[0]
+        self.stats = {"calls": 0, "hedged": 0, "backup_wins": 0, "failovers": 0}
+        self._executor = ThreadPoolExecutor(max_workers=4 * len(self.providers), thread_name_prefix="llm-hedge")
+
+    def ranked(self) -> List[str]:
+        """Healthy providers first; the user's primary leads unless it is unhealthy."""
+        def sort_key(name: str):
+            health = self.health[name]
+            p50 = health.percentile(50)
+            return (
+                not health.healthy,
+                name != self.primary,
+                p50 if p50 is not None else 0.0,
+            )
+        return sorted(self.providers, key=sort_key)
+
+    def hedge_delay(self, name: str) -> float:
+        """Seconds to wait on a provider before hedging: fixed, or its observed p95."""
+        if self.hedge_after:
+            return self.hedge_after
+        health = self.health[name]
+        if len(health.latencies) < MIN_LATENCY_SAMPLES:
+            return DEFAULT_HEDGE_AFTER
+        return max(MIN_HEDGE_AFTER, health.percentile(95))
+
+    def _timed(self, name: str, fn: Callable[[str], T]) -> T:
+        start_time = time.time()
+        try:
+            result = fn(name)
+        except Exception:
+            self.health[name].record_failure()
+            raise
+        self.health[name].record_success(time.time() - start_time)
+        return result
+
+    def call(self, fn: Callable[[str], T], hedge: bool = True,
+             outcome: Optional[Dict[str, Any]] = None) -> T:
+        """
+        Run `fn(provider)` with hedging and failover.
+
+        The first provider gets a head start of `hedge_delay`; if it has not
+        answered by then the next provider is raced against it. A failure
+        immediately launches the next untried provider. The losing call keeps
+        running in the background and only updates the health stats. With
+        `hedge=False` providers are only tried one after another.
+
+        `outcome`, when given, is filled with the `provider` that answered and
+        whether the call was `hedged` or `failed_over`.
+        """
+        self.stats["calls"] += 1
+        outcome = outcome if outcome is not None else {}
+        outcome.update(provider=None, hedged=False, failed_over=False)
+        queue = self.ranked()
+        primary = queue[0]
+        pending = {self._executor.submit(self._timed, primary, fn): primary}
+        queue = queue[1:]
+        last_error: Optional[Exception] = None
+
+        done, _ = wait(pending, timeout=self.hedge_delay(primary) if hedge else None)
+        if not done and queue:
+            self.stats["hedged"] += 1
+            outcome["hedged"] = True
+            backup = queue.pop(0)
+            pending[self._executor.submit(self._timed, backup, fn)] = backup
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    if queue:
+                        self.stats["failovers"] += 1
+                        outcome["failed_over"] = True
+                        backup = queue.pop(0)
+                        pending[self._executor.submit(self._timed, backup, fn)] = backup
+                    continue
+                if name != primary:
+                    self.stats["backup_wins"] += 1
+                outcome["provider"] = name
+                return result
+
+        raise last_error if last_error else RuntimeError("No provider returned a result")
+
+    def summary(self) -> List[Dict[str, Any]]:
+        return [self.health[name].summary() for name in self.providers]
+
+    def close(self) -> None:
+        """Release worker threads without waiting for in-flight losing calls."""
+        self._executor.shutdown(wait=False)
+
+
+class HedgedLLM(BaseLLM):
+    """
+    CrewAI LLM that sends every call through a ProviderPool.
+
+    CrewAI uses BaseLLM instances as-is (other clients are rebuilt as a
+    plain LiteLLM LLM), so this is the layer its agents actually call.
+    Token usage is tallied per provider, including hedged calls that lost
+    the race, and `answers` counts which provider answered each call.
+    """
+
+    def __init__(self, pool: ProviderPool, models: Dict[str, BaseLLM]):
+        primary = models[pool.primary]
+        super().__init__(model=primary.model, temperature=primary.temperature)
+        self.pool = pool
+        self.models = models
+        self.usage = {name: {"prompt_tokens": 0, "completion_tokens": 0} for name in models}
+        self.answers = {name: 0 for name in models}
+        self.hedged_calls = 0
+        self._usage_lock = threading.Lock()
+
+    def _record_usage(self, provider: str, tokens: TokenProcess) -> None:
+        with self._usage_lock:
+            self.usage[provider]["prompt_tokens"] += tokens.prompt_tokens
+            self.usage[provider]["completion_tokens"] += tokens.completion_tokens
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> Union[str, Any]:
+        def invoke(provider: str):
+            llm = self.models[provider]
+            # Agent executors set stop words on the LLM they were given
+            llm.stop = self.stop
+            # The crew's own counter sums every provider alike, so count each one separately too
+            tokens = TokenProcess()
+            try:
+                return llm.call(copy.deepcopy(messages), tools, list(callbacks or []) + [TokenCalcHandler(tokens)],
+                                available_functions)
+            finally:
+                self._record_usage(provider, tokens)
+
+        outcome: Dict[str, Any] = {}
+        # Racing two calls could run a tool function twice; only fail over
+        result = self.pool.call(invoke, hedge=not available_functions, outcome=outcome)
+        with self._usage_lock:
+            self.answers[outcome["provider"]] += 1
+            self.hedged_calls += outcome["hedged"]
+        return result
+
+    def supports_stop_words(self) -> bool:
+        return self.models[self.pool.primary].supports_stop_words()
+
+    def supports_function_calling(self) -> bool:
+        return self.models[self.pool.primary].supports_function_calling()
+
+    def get_context_window_size(self) -> int:
+        return min(llm.get_context_window_size() for llm in self.models.values())
+
+
+def build_hedged_llm(pool: ProviderPool, models: Dict[str, BaseLLM]) -> HedgedLLM:
+    """Wrap one CrewAI LLM per provider in a single hedged LLM."""
+    return HedgedLLM(pool, models)
@@ -0,0 +1,205 @@
+"""
+Incremental refresh of a previous research report.
+Source URLs and content fingerprints from the previous run are re-checked
+with conditional requests; only new or changed sources are passed to the
+writer, which updates the affected sections of the existing report.
+"""
+
+import difflib
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+import requests
+from bs4 import BeautifulSoup
+
+from research_tools import SEARCH_HEADERS, search_web
+from source_dedup import canonicalize_url
+
+FETCH_TIMEOUT = 10
+FETCH_WORKERS = 8
+MAX_SOURCE_CHARS = 2000
+
+STATUS_NEW = "new"
+STATUS_CHANGED = "changed"
+STATUS_UNCHANGED = "unchanged"
+STATUS_GONE = "gone"
+STATUS_ERROR = "error"
+
+
+def _page_text(html: bytes) -> str:
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    return re.sub(r"\s+", " ", soup.get_text(" ")).strip()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def fetch_source(source: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fetch one source, conditionally when validators from a previous fetch exist.
+
+    Returns the source record updated with `status`, `content_hash`, `etag`,
+    `last_modified` and, for new or changed pages, the extracted `text`.
+    """
+    record = {key: source.get(key) for key in ("url", "title", "content_hash", "etag", "last_modified")}
+    headers = dict(SEARCH_HEADERS)
+    if source.get("etag"):
+        headers["If-None-Match"] = source["etag"]
+    if source.get("last_modified"):
+        headers["If-Modified-Since"] = source["last_modified"]
+
+    try:
+        response = requests.get(source["url"], headers=headers, timeout=FETCH_TIMEOUT)
+    except requests.RequestException as e:
+        record.update(status=STATUS_ERROR, error=str(e))
+        return record
+
+    if response.status_code == 304:
+        record["status"] = STATUS_UNCHANGED
+        return record
+    if response.status_code in (404, 410):
+        record["status"] = STATUS_GONE
+        return record
+    if response.status_code != 200:
+        record.update(status=STATUS_ERROR, error=f"HTTP {response.status_code}")
+        return record
+
+    text = _page_text(response.content)
+    new_hash = content_hash(text)
+    if not source.get("content_hash"):
+        status = STATUS_NEW
+    elif new_hash == source["content_hash"]:
+        status = STATUS_UNCHANGED
+    else:
+        status = STATUS_CHANGED
+    record.update(
+        status=status,
+        content_hash=new_hash,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+    )
+    if status != STATUS_UNCHANGED:
+        record["text"] = text[:MAX_SOURCE_CHARS]
+    return record
+
+
+def fetch_sources(sources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fetch many sources concurrently, preserving order."""
+    sources = [source for source in sources if source.get("url")]
+    if not sources:
+        return []
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(sources))) as executor:
+        return list(executor.map(fetch_source, sources))
+
+
+def merge_sources(collected: List[Dict[str, Any]], sources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Append `sources` to `collected` in place, skipping URLs it already holds."""
+    known = {canonicalize_url(source.get("url") or "") for source in collected}
+    for source in sources:
+        key = canonicalize_url(source.get("url") or "")
+        if key and key not in known:
+            known.add(key)
+            collected.append(source)
+    return collected
+
+
+def fingerprint_sources(sources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Baseline fingerprints (hash and HTTP validators) for a run's sources."""
+    records = fetch_sources([{"url": s.get("url"), "title": s.get("title")} for s in sources])
+    # A page that cannot be fetched now has no baseline, and would otherwise
+    # show up as new or removed on every refresh
+    return stored_sources([record for record in records if record["status"] == STATUS_NEW])
+
+
+def discover_sources(query: str, max_urls: int, firecrawl_api_key: str = "") -> List[Dict[str, Any]]:
+    """Cheap source discovery: a Firecrawl search, or the search-engine scraper."""
+    if firecrawl_api_key:
+        try:
+            from firecrawl import FirecrawlApp
+            results = FirecrawlApp(api_key=firecrawl_api_key).search(query, limit=max_urls)
+            data = results.get('data', []) if isinstance(results, dict) else getattr(results, 'data', results)
+            discovered = []
+            for item in data or []:
+                item = item if isinstance(item, dict) else vars(item)
+                if item.get('url'):
+                    discovered.append({"url": item['url'], "title": item.get('title', '')})
+            return discovered[:max_urls]
+        except Exception:
+            pass
+    results, _ = search_web(query)
+    return [{"url": r['url'], "title": r['title']} for r in results if r.get('url')][:max_urls]
+
+
+def refresh_sources(
+    previous: List[Dict[str, Any]],
+    query: str,
+    max_urls: int,
+    firecrawl_api_key: str = "",
+) -> List[Dict[str, Any]]:
+    """
+    Re-check previous sources and fetch newly discovered ones.
+
+    A previous source without a fingerprint (the report was returned before
+    it was taken) is already covered by the report, so it gets its baseline
+    here and counts as unchanged rather than new.
+    """
+    sources = merge_sources([], previous)
+    baseline = {canonicalize_url(source.get("url") or "") for source in sources if not source.get("content_hash")}
+    merge_sources(sources, discover_sources(query, max_urls, firecrawl_api_key))
+    records = fetch_sources(sources)
+    for record in records:
+        if record["status"] == STATUS_NEW and canonicalize_url(record["url"]) in baseline:
+            record["status"] = STATUS_UNCHANGED
+            record.pop("text", None)
+    return records
+
+
+def summarize_changes(records: List[Dict[str, Any]]) -> Dict[str, int]:
+    counts = {status: 0 for status in (STATUS_NEW, STATUS_CHANGED, STATUS_UNCHANGED, STATUS_GONE, STATUS_ERROR)}
+    for record in records:
+        counts[record["status"]] += 1
+    return counts
+
+
+def format_changes(records: List[Dict[str, Any]]) -> str:
+    """Describe new, changed and removed sources for the writer."""
+    sections = []
+    for record in records:
+        label = record.get("title") or record["url"]
+        if record["status"] in (STATUS_NEW, STATUS_CHANGED):
+            sections.append(
+                f"### {record['status'].upper()} SOURCE: {label}\nURL: {record['url']}\n{record.get('text', '')}"
+            )
+        elif record["status"] == STATUS_GONE:
+            sections.append(f"### REMOVED SOURCE: {label}\nURL: {record['url']}\nThis page no longer exists.")
+    return "\n\n".join(sections)
+
+
+def report_diff(old_report: str, new_report: str) -> str:
+    """Unified diff of two report versions."""
+    return "".join(difflib.unified_diff(
+        old_report.splitlines(keepends=True),
+        new_report.splitlines(keepends=True),
+        fromfile="previous report",
+        tofile="refreshed report",
+    ))
+
+
+def stored_sources(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Records to keep with the refreshed report (fetched text dropped, removed pages forgotten)."""
+    kept = []
+    for record in records:
+        if record["status"] == STATUS_GONE:
+            continue
+        kept.append({key: record.get(key) for key in ("url", "title", "content_hash", "etag", "last_modified")})
+    return kept
+
+
+def has_changes(counts: Dict[str, int]) -> bool:
+    return bool(counts[STATUS_NEW] or counts[STATUS_CHANGED] or counts[STATUS_GONE])
+
@@ -0,0 +1,474 @@
+"""
+UI-independent research pipeline.
+Runs the researcher and writer stages for one research job, with model
+routing, caching, provider failover and checkpoints, reporting progress
+through a callback. Used by the Streamlit app and the research service.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional
+
+import requests
+from crewai import Agent, Task, Crew
+from langchain_community.tools import StructuredTool
+
+from llm_routing import DEFAULT_ROUTING, run_routed, validate_report, validate_research
+from provider_pool import ProviderPool, ProviderHealth
+from report_refresh import (
+    fingerprint_sources, refresh_sources, summarize_changes, has_changes,
+    format_changes, report_diff, stored_sources, merge_sources
+)
+from research_tools import (
+    RESEARCH_ERROR_HEADINGS, activity_progress,
+    deep_research_with_firecrawl, deep_research_with_scraping
+)
+from run_checkpoints import CheckpointStore, new_run_id, make_config_key, STAGE_TOOL, STAGE_RESEARCH, STAGE_WRITING
+from run_metrics import RunMetricsStore
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def _emit(on_progress: Optional[ProgressCallback], stage: str, message: str,
+          level: str = "info", progress: Optional[int] = None) -> None:
+    if on_progress is None:
+        return
+    event = {"stage": stage, "message": message, "level": level}
+    if progress is not None:
+        event["progress"] = progress
+    on_progress(event)
+
+
+def test_groq_connection(api_key: str):
+    """Test Groq API connection with a simple request."""
+    try:
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+
+        payload = {
+            "model": "llama3-8b-8192",
+            "messages": [
+                {"role": "user", "content": "Hello! Please respond with 'Connection successful'."}
+            ],
+            "max_tokens": 50
+        }
+
+        response = requests.post(
+            "https://api.groq.com/openai/v1/chat/completions",
+            headers=headers,
+            json=payload,
+            timeout=30
+        )
+
+        if response.status_code == 200:
+            return True, "Connection successful"
+        else:
+            return False, f"API Error: {response.status_code} - {response.text}"
+
+    except Exception as e:
+        return False, f"Connection failed: {str(e)}"
+
+
+def make_research_tool(firecrawl_api_key: str, run_id: str, checkpoints: CheckpointStore,
+                       on_progress: Optional[ProgressCallback] = None,
+                       collected_sources: Optional[List[Dict[str, Any]]] = None,
+                       stage_times: Optional[Dict[str, float]] = None,
+                       config_key: Optional[str] = None):
+    """
+    Build the deep research tool for one run, checkpointing its result.
+    Sources the tool used are added to `collected_sources` when given (once
+    per URL, however often the tool runs), and the time spent researching is added to `stage_times['tool']`.
+    """
+    collected_sources = collected_sources if collected_sources is not None else []
+    stage_times = stage_times if stage_times is not None else {}
+
+    def deep_research_tool(query: str, max_depth: int, time_limit: int, max_urls: int) -> str:
+        """
+        A tool to perform deep research on a given topic using Firecrawl (preferred) or web scraping (fallback).
+        """
+        checkpoint = checkpoints.get(run_id, STAGE_TOOL)
+        if checkpoint:
+            _emit(on_progress, STAGE_TOOL, "♻️ Reusing research results from the previous attempt")
+            merge_sources(collected_sources, checkpoint.get('sources', []))
+            return checkpoint['output']
+
+        tool_start = time.time()
+        try:
+            # Check if Firecrawl API key is available
+            if firecrawl_api_key:
+                _emit(on_progress, STAGE_TOOL, "🔍 Using Firecrawl for advanced web research...")
+
+                def on_activity(activity):
+                    progress, status = activity_progress(activity)
+                    _emit(on_progress, STAGE_TOOL, status, level="activity", progress=progress)
+
+                sources = []
+                result = deep_research_with_firecrawl(
+                    query, max_depth, time_limit, max_urls, firecrawl_api_key,
+                    on_activity=on_activity, collected_sources=sources
+                )
+            else:
+                _emit(on_progress, STAGE_TOOL,
+                      "⚠️ No Firecrawl API key provided. Using basic web scraping (limited results).", level="warning")
+                sources = []
+                result = deep_research_with_scraping(query, collected_sources=sources)
+
+            # Only the URLs and titles are kept; page content is re-fetched on refresh
+            sources = [{"url": source.get("url"), "title": source.get("title")} for source in sources if source.get("url")]
+            merge_sources(collected_sources, sources)
+
+            # Only checkpoint real results so a retry can recover from research errors
+            if not result.lstrip().startswith(RESEARCH_ERROR_HEADINGS):
+                checkpoints.save(run_id, STAGE_TOOL, result, config=config_key, sources=sources)
+            else:
+                heading = result.strip().splitlines()[0]
+                _emit(on_progress, STAGE_TOOL, f"⚠️ Research tool failed: {heading}", level="warning")
+            return result
+        except Exception as e:
+            _emit(on_progress, STAGE_TOOL, f"❌ Research error: {str(e)}", level="error")
+            return f"Error during research: {str(e)}"
+        finally:
+            stage_times["tool"] = stage_times.get("tool", 0.0) + time.time() - tool_start
+
+    return StructuredTool.from_function(deep_research_tool)
+
+
+def create_researcher(llm, research_tool):
+    return Agent(
+        role='Research Analyst',
+        goal='Conduct thorough research on the given topic using available research tools',
+        backstory="""You are a skilled research analyst who specializes in gathering and analyzing information from multiple sources.
+        You have access to powerful research tools and you ALWAYS use them to gather current, accurate information.
+        You never rely solely on your existing knowledge - you actively search for and verify information using your research tools.
+        Your expertise lies in finding relevant sources, extracting key insights, and synthesizing information into comprehensive reports.
+        You are thorough, methodical, and always base your conclusions on actual research findings.""",
+        verbose=True,
+        allow_delegation=False,
+        tools=[research_tool],
+        llm=llm
+    )
+
+
+def create_writer(llm):
+    return Agent(
+        role='Content Writer',
+        goal='Create comprehensive and well-structured research reports',
+        backstory="""You are a skilled content writer who specializes in creating
+        clear, comprehensive, and engaging research reports. You have the ability to
+        synthesize complex information into easily digestible content.""",
+        verbose=True,
+        allow_delegation=False,
+        llm=llm
+    )
+
+
+def run_research_stage(llm, research_topic: str, params: Dict[str, Any], research_tool):
+    research_task = Task(
+        description=f"""IMPORTANT: You MUST use the deep_research_tool to perform actual research on the topic: {research_topic}
+
+        CRITICAL INSTRUCTIONS:
+        1. FIRST, call the deep_research_tool with these exact parameters:
+           - query: "{research_topic}"
+           - max_depth: {params['max_depth']}
+           - time_limit: {params['time_limit']}
+           - max_urls: {params['max_urls']}
+
+        2. THEN, analyze the research results and provide:
+           - Key findings from the actual research
+           - Important insights and takeaways
+           - Relevant data or statistics found
+           - Summary of the main points discovered
+
+        3. DO NOT just write generic statements - use the actual research data
+        4. Reference specific information found during the research
+        5. Be thorough and provide detailed analysis based on real findings
+
+        Remember: You have access to the deep_research_tool - USE IT to gather real information!""",
+        agent=create_researcher(llm, research_tool),
+        expected_output="A comprehensive research report with detailed findings and insights based on actual web research."
+    )
+    crew = Crew(agents=[research_task.agent], tasks=[research_task], verbose=True)
+    return crew.kickoff()
+
+
+def run_writing_stage(llm, research_topic: str, research_output: str):
+    writing_task = Task(
+        description=f"""Based on the research findings about {research_topic}, create a
+        comprehensive and well-structured research report.
+
+        Research findings:
+        {research_output}
+
+        The report should include:
+        1. Executive Summary
+        2. Key Findings
+        3. Detailed Analysis
+        4. Conclusions and Recommendations
+        5. References
+
+        Make sure the content is clear, professional, and well-organized.""",
+        agent=create_writer(llm),
+        expected_output="A professional research report with proper structure and formatting."
+    )
+    crew = Crew(agents=[writing_task.agent], tasks=[writing_task], verbose=True)
+    return crew.kickoff()
+
+
+def run_refresh_stage(llm, research_topic: str, previous_report: str, changes: str):
+    refresh_task = Task(
+        description=f"""You are updating an existing research report about {research_topic}.
+        Some of its sources changed, new sources appeared, or sources were removed.
+
+        Existing report:
+        {previous_report}
+
+        Source changes:
+        {changes}
+
+        INSTRUCTIONS:
+        1. Update ONLY the sections affected by the source changes
+        2. Keep every unaffected section exactly as it is, word for word
+        3. Add new findings from new sources and revise findings whose sources changed
+        4. Remove claims and references that relied only on removed sources
+        5. Keep the same structure: Executive Summary, Key Findings, Detailed Analysis,
+           Conclusions and Recommendations, References
+
+        Return the complete updated report.""",
+        agent=create_writer(llm),
+        expected_output="The complete research report with only the affected sections updated."
+    )
+    crew = Crew(agents=[refresh_task.agent], tasks=[refresh_task], verbose=True)
+    return crew.kickoff()
+
+
+def _build_pool(job: Dict[str, Any], provider_health: Dict[str, ProviderHealth],
+                on_progress: Optional[ProgressCallback], primary: Optional[str] = None) -> Optional[ProviderPool]:
+    """Hedge and fail over across every provider that has a key; `primary` overrides the job's provider."""
+    api_keys = job.get("api_keys", {})
+    if not job.get("failover_enabled"):
+        return None
+    pool_providers = [name for name in ("OpenAI", "Groq") if api_keys.get(name)]
+    if len(pool_providers) < 2:
+        _emit(on_progress, "setup", "⚠️ Failover is enabled but no backup provider key is set.", level="warning")
+        return None
+    return ProviderPool(
+        pool_providers,
+        health=provider_health,
+        hedge_after=job.get("hedge_after") or None,
+        primary=primary or job["provider"]
+    )
+
+
+def run_research_job(
+    job: Dict[str, Any],
+    on_progress: Optional[ProgressCallback] = None,
+    provider_health: Optional[Dict[str, ProviderHealth]] = None,
+) -> Dict[str, Any]:
+    """
+    Run a research job end to end and return it in the JSON export shape.
+
+    `job` holds `topic`, `params` (max_depth/time_limit/max_urls/research_mode),
+    `provider`, `api_keys` (OpenAI/Groq/Firecrawl), and optionally `routing`,
+    `use_cache`, `failover_enabled`, `hedge_after`, `run_id` and `resume`.
+    A resume continues `run_id` from its last completed stage.
+    """
+    research_topic = job["topic"]
+    params = job["params"]
+    provider = job["provider"]
+    api_keys = job.get("api_keys", {})
+    routing = {**DEFAULT_ROUTING, **job.get("routing", {})}
+    use_cache = job.get("use_cache", True)
+    provider_health = provider_health if provider_health is not None else {}
+
+    # Each start gets its own run; a resume only reuses checkpoints made with the same settings
+    run_id = job.get("run_id") or new_run_id()
+    config_key = make_config_key(research_topic, params, provider, routing)
+    checkpoints = CheckpointStore()
+    if not job.get("resume"):
+        checkpoints.prune()
+    elif checkpoints.config(run_id) not in (None, config_key):
+        _emit(on_progress, "setup", "Topic, provider or routing changed since the failed run; starting fresh",
+              level="warning")
+        checkpoints.discard(run_id)
+    completed_stage = checkpoints.last_completed(run_id) if job.get("resume") else None
+    if completed_stage:
+        _emit(on_progress, "setup", f"♻️ Resuming run {run_id} after the '{completed_stage}' stage")
+
+    # Test Groq connection if using Groq (already verified when resuming a run)
+    pool_primary = None
+    if provider == "Groq" and not completed_stage:
+        _emit(on_progress, "setup", "Testing Groq API connection...")
+        success, message = test_groq_connection(api_keys.get("Groq", ""))
+        if not success:
+            if job.get("failover_enabled") and api_keys.get("OpenAI"):
+                provider_health.setdefault("Groq", ProviderHealth("Groq")).record_failure()
+                # One failure does not trip Groq's health, so lead with OpenAI for this run
+                pool_primary = "OpenAI"
+                _emit(on_progress, "setup", f"Groq API test failed: {message}. Failing over to OpenAI.", level="warning")
+            else:
+                raise RuntimeError(f"Groq API test failed: {message}")
+        else:
+            _emit(on_progress, "setup", "Groq API connection successful!", level="success")
+
+    start_time = time.time()
+    collected_sources = []
+    stage_times = {}
+    research_tool = make_research_tool(
+        api_keys.get("Firecrawl", ""), run_id, checkpoints, on_progress, collected_sources, stage_times,
+        config_key
+    )
+    route_metrics = []
+    pool = _build_pool(job, provider_health, on_progress, primary=pool_primary)
+    pool_keys = {name: api_keys.get(name, "") for name in ("OpenAI", "Groq")}
+    fingerprinter = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fingerprint")
+
+    try:
+        research_checkpoint = checkpoints.get(run_id, STAGE_RESEARCH)
+        if research_checkpoint:
+            research_output = research_checkpoint['output']
+            route_metrics.extend(research_checkpoint.get('routes', []))
+            tool_checkpoint = checkpoints.get(run_id, STAGE_TOOL)
+            if tool_checkpoint:
+                merge_sources(collected_sources, tool_checkpoint.get('sources', []))
+        else:
+            _emit(on_progress, STAGE_RESEARCH, "Running the research crew...")
+            stage_start = time.time()
+            research_output = str(run_routed(
+                "research", routing["research"], provider, pool_keys[provider],
+                lambda llm: run_research_stage(llm, research_topic, params, research_tool),
+                validator=validate_research, route_metrics=route_metrics,
+                use_cache=use_cache, pool=pool, pool_keys=pool_keys
+            ))
+            stage_times["research"] = time.time() - stage_start
+            checkpoints.save(run_id, STAGE_RESEARCH, research_output, config=config_key, routes=list(route_metrics))
+
+        # Fingerprint sources for later refreshes while the writer runs
+        fingerprints = fingerprinter.submit(fingerprint_sources, list(collected_sources))
+
+        writing_checkpoint = checkpoints.get(run_id, STAGE_WRITING)
+        if writing_checkpoint:
+            result = writing_checkpoint['output']
+            route_metrics = writing_checkpoint.get('routes', route_metrics)
+        else:
+            _emit(on_progress, STAGE_WRITING, "Writing the research report...")
+            stage_start = time.time()
+            result = str(run_routed(
+                "writing", routing["writing"], provider, pool_keys[provider],
+                lambda llm: run_writing_stage(llm, research_topic, research_output),
+                validator=validate_report, route_metrics=route_metrics,
+                use_cache=use_cache, pool=pool, pool_keys=pool_keys
+            ))
+            stage_times["writing"] = time.time() - stage_start
+            checkpoints.save(run_id, STAGE_WRITING, result, config=config_key, routes=list(route_metrics))
+
+        # The report never waits for fingerprints; sources without one get it on their first refresh
+        if fingerprints.done() and not fingerprints.exception():
+            sources = fingerprints.result()
+        else:
+            sources = [{"url": source["url"], "title": source.get("title")} for source in collected_sources]
+    finally:
+        fingerprinter.shutdown(wait=False, cancel_futures=True)
+        if pool is not None:
+            pool.close()
+
+    # A finished run is never resumed
+    checkpoints.discard(run_id)
+
+    metrics = {
+        "research_time": time.time() - start_time,
+        "max_depth": params['max_depth'],
+        "max_urls": params['max_urls'],
+        "routes": route_metrics,
+        "stage_times": stage_times
+    }
+    if pool is not None:
+        metrics["provider_pool"] = {"stats": dict(pool.stats), "providers": pool.summary()}
+
+    # Only runs that executed every stage feed the completion-time predictions
+    if not completed_stage and {"tool", "research", "writing"} <= stage_times.keys():
+        try:
+            RunMetricsStore().record(provider, params, stage_times, used_firecrawl=bool(api_keys.get("Firecrawl")))
+        except Exception as e:
+            _emit(on_progress, "done", f"⚠️ Could not record run timings: {str(e)}", level="warning")
+    _emit(on_progress, "done", "Research complete", level="success", progress=100)
+
+    return {
+        "topic": research_topic,
+        "timestamp": datetime.now().isoformat(),
+        "template": "Custom",
+        "metrics": metrics,
+        "report": result,
+        "sources": sources
+    }
+
+
+def run_refresh_job(
+    job: Dict[str, Any],
+    previous: Dict[str, Any],
+    on_progress: Optional[ProgressCallback] = None,
+    provider_health: Optional[Dict[str, ProviderHealth]] = None,
+) -> Dict[str, Any]:
+    """
+    Refresh a previous report, re-fetching only new or changed sources.
+
+    `previous` is an earlier export (or history entry) with `report` and
+    `sources`. The writer runs only if some source is new, changed or gone;
+    the result carries a `diff` against the previous report.
+    """
+    research_topic = job["topic"]
+    params = job["params"]
+    provider = job["provider"]
+    api_keys = job.get("api_keys", {})
+    routing = {**DEFAULT_ROUTING, **job.get("routing", {})}
+    provider_health = provider_health if provider_health is not None else {}
+    previous_report = previous["report"]
+
+    start_time = time.time()
+    _emit(on_progress, STAGE_TOOL, "🔎 Checking previous sources for changes...")
+    records = refresh_sources(
+        previous.get("sources", []), research_topic, params["max_urls"], api_keys.get("Firecrawl", "")
+    )
+    counts = summarize_changes(records)
+    _emit(on_progress, STAGE_TOOL,
+          f"{counts['new']} new, {counts['changed']} changed, {counts['gone']} removed, "
+          f"{counts['unchanged']} unchanged sources", progress=50)
+
+    route_metrics = []
+    result = previous_report
+    if has_changes(counts):
+        pool = _build_pool(job, provider_health, on_progress)
+        pool_keys = {name: api_keys.get(name, "") for name in ("OpenAI", "Groq")}
+        changes = format_changes(records)
+        try:
+            _emit(on_progress, STAGE_WRITING, "Updating the affected report sections...")
+            result = str(run_routed(
+                "refresh", routing["writing"], provider, pool_keys[provider],
+                lambda llm: run_refresh_stage(llm, research_topic, previous_report, changes),
+                validator=validate_report, route_metrics=route_metrics,
+                use_cache=job.get("use_cache", True), pool=pool, pool_keys=pool_keys
+            ))
+        finally:
+            if pool is not None:
+                pool.close()
+    else:
+        _emit(on_progress, STAGE_WRITING, "No source changes; the report is up to date", level="success")
+
+    _emit(on_progress, "done", "Refresh complete", level="success", progress=100)
+    return {
+        "topic": research_topic,
+        "timestamp": datetime.now().isoformat(),
+        "template": "Custom",
+        "metrics": {
+            "research_time": time.time() - start_time,
+            "max_depth": params['max_depth'],
+            "max_urls": params['max_urls'],
+            "routes": route_metrics,
+            "refresh": counts
+        },
+        "report": result,
+        "sources": stored_sources(records),
+        "diff": report_diff(previous_report, result)
+    }
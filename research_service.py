@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Standalone research service.
+Accepts research jobs over HTTP/JSON, runs them on a pool of worker
+processes and streams progress as Server-Sent Events.
+
+    python research_service.py --port 8765 --workers 4
+
+Endpoints:
+    POST /jobs               submit a job (see research_pipeline.run_research_job);
+                             with `previous`, a refresh (run_refresh_job)
+    GET  /jobs/<id>          job status; includes the report once finished
+    GET  /jobs/<id>/events   progress stream (text/event-stream)
+    GET  /health             worker and queue counts
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+from llm_routing import DEFAULT_ROUTING, ROUTING_POLICIES
+
+DEFAULT_PORT = 8765
+JOB_TTL = 3600
+SSE_KEEPALIVE = 15.0
+# How long a stream waits for a finished job's remaining events if its worker died
+DRAIN_TIMEOUT = 10.0
+
+REQUIRED_JOB_FIELDS = ("topic", "params", "provider", "api_keys")
+REQUIRED_PARAMS = ("max_depth", "time_limit", "max_urls")
+BOOL_JOB_FIELDS = ("use_cache", "resume", "failover_enabled")
+RUN_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+
+def _run_job(job_id: str, job: Dict[str, Any], events) -> Dict[str, Any]:
+    """Worker process entry point: run one job, forwarding progress to the server."""
+    from research_pipeline import run_research_job, run_refresh_job
+
+    def on_progress(event: Dict[str, Any]) -> None:
+        events.put((job_id, event))
+
+    try:
+        if job.get("previous") is not None:
+            return run_refresh_job(job, job["previous"], on_progress=on_progress)
+        return run_research_job(job, on_progress=on_progress)
+    finally:
+        # Queued after the job's last event, so streams know nothing else is coming
+        events.put((job_id, None))
+
+
+class JobRecord:
+    """Server-side state of a submitted job."""
+
+    def __init__(self, job_id: str, topic: str):
+        self.job_id = job_id
+        self.topic = topic
+        self.status = "queued"
+        self.events = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.drained = False
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    @property
+    def complete(self) -> bool:
+        """Finished and every progress event received (or the worker died before sending them)."""
+        if not self.finished:
+            return False
+        return self.drained or time.time() - self.finished_at > DRAIN_TIMEOUT
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "job_id": self.job_id,
+            "topic": self.topic,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "finished_at": self.finished_at,
+            "events": len(self.events),
+        }
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class ResearchService:
+    """Job registry plus the process pool that executes jobs."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        # Spawned workers never inherit the server's threads or sockets
+        context = multiprocessing.get_context("spawn")
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        self.manager = context.Manager()
+        self.events = self.manager.Queue()
+        self.jobs: Dict[str, JobRecord] = {}
+        self.changed = threading.Condition()
+        threading.Thread(target=self._pump_events, daemon=True, name="event-pump").start()
+
+    def submit(self, job: Dict[str, Any]) -> JobRecord:
+        job_id = uuid.uuid4().hex
+        record = JobRecord(job_id, job["topic"])
+        with self.changed:
+            self._prune()
+            self.jobs[job_id] = record
+        future = self.executor.submit(_run_job, job_id, job, self.events)
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        return record
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        with self.changed:
+            return self.jobs.get(job_id)
+
+    def _pump_events(self) -> None:
+        while True:
+            try:
+                job_id, event = self.events.get()
+            except (EOFError, OSError):
+                return
+            with self.changed:
+                record = self.jobs.get(job_id)
+                if record is not None and event is None:
+                    record.drained = True
+                    self.changed.notify_all()
+                elif record is not None:
+                    if not record.finished:
+                        record.status = "running"
+                    record.events.append(event)
+                    self.changed.notify_all()
+
+    def _finish(self, job_id: str, future) -> None:
+        with self.changed:
+            record = self.jobs.get(job_id)
+            if record is None:
+                return
+            try:
+                record.result = future.result()
+                record.status = "completed"
+            except Exception as e:
+                record.error = str(e)
+                record.status = "failed"
+            record.finished_at = time.time()
+            self.changed.notify_all()
+
+    def _prune(self) -> None:
+        now = time.time()
+        expired = [job_id for job_id, record in self.jobs.items()
+                   if record.finished and now - record.finished_at > JOB_TTL]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def health(self) -> Dict[str, Any]:
+        with self.changed:
+            statuses = [record.status for record in self.jobs.values()]
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+            "completed": statuses.count("completed"),
+            "failed": statuses.count("failed"),
+        }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.manager.shutdown()
+
+
+def _is_int(value: Any) -> bool:
+    # bool is an int subclass, but true/false is never a valid count
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_job(job: Any) -> Optional[str]:
+    """Return an error message if a submitted job is malformed."""
+    if not isinstance(job, dict):
+        return "Job must be a JSON object"
+    missing = [field for field in REQUIRED_JOB_FIELDS if field not in job]
+    if missing:
+        return f"Missing fields: {', '.join(missing)}"
+    if not isinstance(job["topic"], str) or not job["topic"].strip():
+        return "topic must be a non-empty string"
+    if not isinstance(job["params"], dict) or any(p not in job["params"] for p in REQUIRED_PARAMS):
+        return f"params must include {', '.join(REQUIRED_PARAMS)}"
+    if any(not _is_int(job["params"][p]) or job["params"][p] < 1 for p in REQUIRED_PARAMS):
+        return f"{', '.join(REQUIRED_PARAMS)} must be positive integers"
+    if job["provider"] not in ("OpenAI", "Groq"):
+        return "provider must be 'OpenAI' or 'Groq'"
+    if not isinstance(job["api_keys"], dict):
+        return "api_keys must be an object"
+    # The run ID names the checkpoint file, so only accept the IDs the app generates
+    if job.get("run_id") is not None and not (isinstance(job["run_id"], str) and RUN_ID_RE.fullmatch(job["run_id"])):
+        return "run_id must be a 32-character hex string"
+    routing = job.get("routing")
+    if routing is not None and not (
+        isinstance(routing, dict)
+        and all(task in DEFAULT_ROUTING and policy in ROUTING_POLICIES for task, policy in routing.items())
+    ):
+        return f"routing must map {', '.join(DEFAULT_ROUTING)} to one of: {', '.join(ROUTING_POLICIES)}"
+    for field in BOOL_JOB_FIELDS:
+        if job.get(field) is not None and not isinstance(job[field], bool):
+            return f"{field} must be true or false"
+    hedge_after = job.get("hedge_after")
+    if hedge_after is not None and not (_is_number(hedge_after) and hedge_after >= 0):
+        return "hedge_after must be a non-negative number of seconds"
+    # Refresh jobs carry the report and source fingerprints they update
+    previous = job.get("previous")
+    if previous is not None and not (
+        isinstance(previous, dict) and isinstance(previous.get("report"), str)
+        and isinstance(previous.get("sources", []), list)
+    ):
+        return "previous must be an object with a report string and a sources list"
+    if not job["api_keys"].get(job["provider"]):
+        return f"api_keys must include a {job['provider']} key"
+    return None
+
+
+class ResearchRequestHandler(BaseHTTPRequestHandler):
+    service: ResearchService = None
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._send_json(404, {"error": "Not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = json.loads(self.rfile.read(length) or b"null")
+        except (ValueError, json.JSONDecodeError):
+            return self._send_json(400, {"error": "Invalid JSON body"})
+        error = validate_job(job)
+        if error:
+            return self._send_json(400, {"error": error})
+        record = self.service.submit(job)
+        self._send_json(202, {"job_id": record.job_id, "status": record.status})
+
+    def do_GET(self):
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        if parts == ["health"]:
+            return self._send_json(200, self.service.health())
+        if len(parts) >= 2 and parts[0] == "jobs":
+            record = self.service.get(parts[1])
+            if record is None:
+                return self._send_json(404, {"error": "Unknown job"})
+            if len(parts) == 2:
+                with self.service.changed:
+                    return self._send_json(200, record.to_dict())
+            if len(parts) == 3 and parts[2] == "events":
+                return self._stream_events(record)
+        self._send_json(404, {"error": "Not found"})
+
+    def _stream_events(self, record: JobRecord) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        sent = 0
+        try:
+            while True:
+                with self.service.changed:
+                    if sent >= len(record.events) and not record.complete:
+                        self.service.changed.wait(timeout=DRAIN_TIMEOUT if record.finished else SSE_KEEPALIVE)
+                    pending = record.events[sent:]
+                    complete = record.complete
+                for event in pending:
+                    self.wfile.write(f"event: progress\ndata: {json.dumps(event)}\n\n".encode("utf-8"))
+                sent += len(pending)
+                if complete and sent >= len(record.events):
+                    final = {"status": record.status, "error": record.error}
+                    self.wfile.write(f"event: {record.status}\ndata: {json.dumps(final)}\n\n".encode("utf-8"))
+                    break
+                if not pending:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        if os.getenv("RESEARCH_SERVICE_DEBUG"):
+            super().log_message(format, *args)
+
+
+def submit_job(service_url: str, job: Dict[str, Any], timeout: float = 30) -> str:
+    """Submit a job to a running service and return its ID."""
+    import requests
+    response = requests.post(f"{service_url.rstrip('/')}/jobs", json=job, timeout=timeout)
+    if response.status_code != 202:
+        raise RuntimeError(f"Research service rejected the job: {response.status_code} - {response.text}")
+    return response.json()["job_id"]
+
+
+def iter_job_events(service_url: str, job_id: str):
+    """Yield (event_name, data) pairs from a job's progress stream until it finishes."""
+    import requests
+    with requests.get(f"{service_url.rstrip('/')}/jobs/{job_id}/events", stream=True, timeout=(10, None)) as response:
+        response.raise_for_status()
+        event_name = "message"
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or line.startswith(":"):
+                continue
+            if line.startswith("event:"):
+                event_name = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                yield event_name, json.loads(line[len("data:"):].strip())
+                event_name = "message"
+
+
+def get_job(service_url: str, job_id: str, timeout: float = 30) -> Dict[str, Any]:
+    """Fetch a job's status and, once completed, its report."""
+    import requests
+    response = requests.get(f"{service_url.rstrip('/')}/jobs/{job_id}", timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the AI Deep Research service")
+    parser.add_argument("--host", default=os.getenv("RESEARCH_SERVICE_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("RESEARCH_SERVICE_PORT", DEFAULT_PORT)))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.getenv("RESEARCH_SERVICE_WORKERS", os.cpu_count() or 1)),
+                        help="Number of worker processes")
+    args = parser.parse_args()
+
+    ResearchRequestHandler.service = ResearchService(args.workers)
+    server = ThreadingHTTPServer((args.host, args.port), ResearchRequestHandler)
+    print(f"🔬 Research service listening on http://{args.host}:{args.port} ({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        ResearchRequestHandler.service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Durable per-stage checkpoints for research runs.
+Each run gets a unique ID when it starts, so a retry of that run resumes
+from the last completed stage instead of repeating the Firecrawl research
+and the researcher pass, without touching any other session's runs.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import Dict, Any, Optional
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "runs")
+CHECKPOINT_TTL = 7 * 24 * 3600
+
+# Stages in execution order
+STAGE_TOOL = "tool_result"
+STAGE_RESEARCH = "research"
+STAGE_WRITING = "writing"
+STAGES = [STAGE_TOOL, STAGE_RESEARCH, STAGE_WRITING]
+
+
+def new_run_id() -> str:
+    """Unique ID for a fresh run."""
+    return uuid.uuid4().hex
+
+
+def make_config_key(topic: str, params: Dict[str, Any], provider: str, routing: Dict[str, str]) -> str:
+    """Hash of everything that shapes stage outputs; a resume with a different one starts fresh."""
+    key = {
+        "topic": topic.strip().lower(),
+        "max_depth": params.get("max_depth"),
+        "time_limit": params.get("time_limit"),
+        "max_urls": params.get("max_urls"),
+        "provider": provider,
+        "routing": routing,
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class CheckpointStore:
+    """JSON file per run, written atomically so a crash never leaves a torn checkpoint."""
+
+    def __init__(self, directory: Optional[str] = None, ttl: float = CHECKPOINT_TTL):
+        self.directory = directory or os.getenv("RUN_CHECKPOINT_DIR", DEFAULT_CHECKPOINT_DIR)
+        self.ttl = ttl
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, run_id: str) -> str:
+        return os.path.join(self.directory, f"{run_id}.json")
+
+    def load(self, run_id: str) -> Dict[str, Any]:
+        """All checkpoints for a run (empty if none or expired)."""
+        try:
+            with open(self._path(run_id), "r", encoding="utf-8") as f:
+                run = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if time.time() - run.get("updated_at", 0) > self.ttl:
+            self.discard(run_id)
+            return {}
+        return run
+
+    def get(self, run_id: str, stage: str) -> Optional[Dict[str, Any]]:
+        """The checkpoint for one stage, or None if it has not completed."""
+        return self.load(run_id).get("stages", {}).get(stage)
+
+    def config(self, run_id: str) -> Optional[str]:
+        """Config key the run was started with (see make_config_key)."""
+        return self.load(run_id).get("config")
+
+    def save(self, run_id: str, stage: str, output: str, config: Optional[str] = None, **extra: Any) -> None:
+        run = self.load(run_id) or {"run_id": run_id, "created_at": time.time(), "stages": {}}
+        if config is not None:
+            run["config"] = config
+        run["stages"][stage] = {"output": output, "completed_at": time.time(), **extra}
+        run["updated_at"] = time.time()
+        # Sessions are threads of one process, so the temp file must be unique per write
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f"{run_id}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(run, f)
+            os.replace(tmp_path, self._path(run_id))
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def last_completed(self, run_id: str) -> Optional[str]:
+        """Name of the latest stage that has a checkpoint."""
+        stages = self.load(run_id).get("stages", {})
+        completed = [stage for stage in STAGES if stage in stages]
+        return completed[-1] if completed else None
+
+    def discard(self, run_id: str) -> None:
+        try:
+            os.remove(self._path(run_id))
+        except FileNotFoundError:
+            pass
+
+    def prune(self) -> int:
+        """Delete expired runs; returns how many were removed."""
+        removed = 0
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith((".json", ".tmp")):
+                continue
+            path = os.path.join(self.directory, name)
+            if now - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                removed += 1
+        return removed
@@ -0,0 +1,241 @@
+"""
+Local store of research run timings.
+Records the per-stage durations, provider and parameters of every completed
+run, predicts how long a configuration will take from that history, and
+picks the deepest parameters that still finish within a deadline.
+"""
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from statistics import median
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from percentiles import percentile
+
+DEFAULT_METRICS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "run_metrics.sqlite")
+MAX_RUNS = 500
+HISTORY_WINDOW = 50
+MIN_FIT_RUNS = 3
+MIN_RANGE_RUNS = 5
+
+# Search space for deadline tuning, matching the sidebar sliders
+DEPTH_RANGE = range(1, 6)
+URL_RANGE = range(5, 21)
+TIME_LIMIT_MINUTES = range(1, 11)
+
+# Used until enough runs have been recorded
+PRIOR_LLM_SECONDS = {"OpenAI": 60.0, "Groq": 30.0}
+PRIOR_SCRAPING_SECONDS = 15.0
+PRIOR_RANGE = (0.75, 1.35)
+# Firecrawl may run slightly past its time limit before returning
+TOOL_OVERRUN = 1.2
+RIDGE = 1e-3
+
+
+def prior_tool_seconds(max_depth: int, max_urls: int, time_limit: int) -> float:
+    return min(float(time_limit), 30.0 * max_depth + 6.0 * max_urls)
+
+
+def format_duration(seconds: float) -> str:
+    """Short human-readable duration, e.g. '45s' or '3.5 min'."""
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    return f"{seconds / 60:.1f} min"
+
+
+class RunMetricsStore:
+    """SQLite-backed history of completed runs, bounded to the newest MAX_RUNS."""
+
+    def __init__(self, path: Optional[str] = None, max_runs: int = MAX_RUNS):
+        self.path = path or os.getenv("RUN_METRICS_PATH", DEFAULT_METRICS_PATH)
+        self.max_runs = max_runs
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    recorded_at REAL NOT NULL,
+                    provider TEXT NOT NULL,
+                    used_firecrawl INTEGER NOT NULL,
+                    max_depth INTEGER NOT NULL,
+                    max_urls INTEGER NOT NULL,
+                    time_limit INTEGER NOT NULL,
+                    tool_seconds REAL NOT NULL,
+                    research_seconds REAL NOT NULL,
+                    writing_seconds REAL NOT NULL
+                )"""
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Written from app sessions and service workers alike, so connections are per call
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, provider: str, params: Dict[str, Any], stage_times: Dict[str, float],
+               used_firecrawl: bool) -> None:
+        """Store one completed run; `stage_times` holds tool/research/writing seconds."""
+        with self._connect() as conn:
+            conn.execute(
+                """INSERT INTO runs (recorded_at, provider, used_firecrawl, max_depth, max_urls, time_limit,
+                                     tool_seconds, research_seconds, writing_seconds)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (time.time(), provider, int(used_firecrawl), params["max_depth"], params["max_urls"],
+                 params["time_limit"], stage_times.get("tool", 0.0), stage_times.get("research", 0.0),
+                 stage_times.get("writing", 0.0)),
+            )
+            conn.execute(
+                "DELETE FROM runs WHERE id NOT IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)",
+                (self.max_runs,),
+            )
+
+    def recent(self, used_firecrawl: bool, limit: int = HISTORY_WINDOW) -> List[Dict[str, Any]]:
+        """Newest runs first, for every provider."""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT * FROM runs WHERE used_firecrawl = ? ORDER BY id DESC LIMIT ?",
+                (int(used_firecrawl), limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def model(self, provider: str, used_firecrawl: bool) -> "RunTimeModel":
+        return RunTimeModel.fit(self.recent(used_firecrawl), provider, used_firecrawl)
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> Optional[List[float]]:
+    """Gaussian elimination with partial pivoting; None if singular."""
+    size = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(size)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(rows[r][col]))
+        if abs(rows[pivot][col]) < 1e-12:
+            return None
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(col + 1, size):
+            factor = rows[r][col] / rows[col][col]
+            for c in range(col, size + 1):
+                rows[r][c] -= factor * rows[col][c]
+    solution = [0.0] * size
+    for r in range(size - 1, -1, -1):
+        solution[r] = (rows[r][size] - sum(rows[r][c] * solution[c] for c in range(r + 1, size))) / rows[r][r]
+    return solution
+
+
+class RunTimeModel:
+    """
+    Completion-time model fitted on recorded runs.
+
+    The tool stage (Firecrawl or scraping) is shared by all providers and
+    fitted as a ridge regression on depth and source count, capped by the
+    time limit. The LLM work (research stage minus the tool, plus writing)
+    is the median for the chosen provider. The range comes from how far
+    past runs landed from the fitted estimate.
+    """
+
+    def __init__(self, provider: str, used_firecrawl: bool, runs: List[Dict[str, Any]],
+                 coefficients: Optional[List[float]], llm_seconds: float, ratio_range: Tuple[float, float]):
+        self.provider = provider
+        self.used_firecrawl = used_firecrawl
+        self.runs = runs
+        self.coefficients = coefficients
+        self.llm_seconds = llm_seconds
+        self.ratio_range = ratio_range
+
+    @classmethod
+    def fit(cls, runs: List[Dict[str, Any]], provider: str, used_firecrawl: bool) -> "RunTimeModel":
+        coefficients = None
+        if used_firecrawl and len(runs) >= MIN_FIT_RUNS:
+            features = [[1.0, run["max_depth"], run["max_urls"]] for run in runs]
+            targets = [run["tool_seconds"] for run in runs]
+            normal = [[sum(f[i] * f[j] for f in features) + (RIDGE if i == j and i else 0.0)
+                       for j in range(3)] for i in range(3)]
+            coefficients = _solve(normal, [sum(f[i] * t for f, t in zip(features, targets)) for i in range(3)])
+
+        provider_runs = [run for run in runs if run["provider"] == provider]
+        if len(provider_runs) >= MIN_FIT_RUNS:
+            llm_seconds = median(
+                max(0.0, run["research_seconds"] - run["tool_seconds"]) + run["writing_seconds"]
+                for run in provider_runs
+            )
+        else:
+            llm_seconds = PRIOR_LLM_SECONDS.get(provider, max(PRIOR_LLM_SECONDS.values()))
+
+        model = cls(provider, used_firecrawl, runs, coefficients, llm_seconds, PRIOR_RANGE)
+        if len(provider_runs) >= MIN_RANGE_RUNS:
+            ratios = [
+                (run["research_seconds"] + run["writing_seconds"])
+                / max(1.0, model.estimate(run["max_depth"], run["max_urls"], run["time_limit"]))
+                for run in provider_runs
+            ]
+            model.ratio_range = (min(1.0, percentile(ratios, 10)), max(1.0, percentile(ratios, 90)))
+        return model
+
+    def tool_seconds(self, max_depth: int, max_urls: int, time_limit: int, capped: bool = True) -> float:
+        """Expected tool stage time; uncapped, how long the full depth would take."""
+        if not self.used_firecrawl:
+            scraping = [run["tool_seconds"] for run in self.runs]
+            return median(scraping) if len(scraping) >= MIN_FIT_RUNS else PRIOR_SCRAPING_SECONDS
+        if self.coefficients is None:
+            return prior_tool_seconds(max_depth, max_urls, time_limit if capped else float("inf"))
+        c0, c_depth, c_urls = self.coefficients
+        seconds = max(1.0, c0 + c_depth * max_depth + c_urls * max_urls)
+        return min(seconds, time_limit * TOOL_OVERRUN) if capped else seconds
+
+    def estimate(self, max_depth: int, max_urls: int, time_limit: int) -> float:
+        return self.tool_seconds(max_depth, max_urls, time_limit) + self.llm_seconds
+
+    def predict(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Expected duration plus a likely range for one parameter set."""
+        seconds = self.estimate(params["max_depth"], params["max_urls"], params["time_limit"])
+        low, high = self.ratio_range
+        provider_runs = sum(1 for run in self.runs if run["provider"] == self.provider)
+        return {
+            "seconds": seconds,
+            "low": seconds * low,
+            "high": seconds * high,
+            "samples": provider_runs,
+            "from_history": provider_runs >= MIN_FIT_RUNS,
+        }
+
+    def describe(self, params: Dict[str, Any]) -> str:
+        prediction = self.predict(params)
+        return f"{format_duration(prediction['low'])}–{format_duration(prediction['high'])}"
+
+    def tune_for_deadline(self, deadline_seconds: float) -> Tuple[Dict[str, Any], Dict[str, Any], bool]:
+        """
+        Deepest parameters whose likely worst case fits the deadline.
+
+        The time limit is what is left of the deadline after the LLM work,
+        so Firecrawl itself is bounded; depth and sources are then maximised
+        among settings expected to complete within that limit rather than
+        being cut off by it. Returns (params, prediction, fits).
+        """
+        high_ratio = self.ratio_range[1]
+        budget_minutes = int((deadline_seconds / high_ratio - self.llm_seconds) // 60)
+        time_limit = 60 * min(max(budget_minutes, TIME_LIMIT_MINUTES[0]), TIME_LIMIT_MINUTES[-1])
+
+        best = None
+        for max_depth in DEPTH_RANGE:
+            for max_urls in URL_RANGE:
+                params = {"max_depth": max_depth, "max_urls": max_urls, "time_limit": time_limit}
+                if self.tool_seconds(max_depth, max_urls, time_limit, capped=False) > time_limit:
+                    continue
+                prediction = self.predict(params)
+                if prediction["high"] > deadline_seconds:
+                    continue
+                score = (max_depth * max_urls, max_urls)
+                if best is None or score > best[0]:
+                    best = (score, params, prediction)
+
+        if best is None:
+            params = {"max_depth": DEPTH_RANGE[0], "max_urls": URL_RANGE[0], "time_limit": time_limit}
+            return params, self.predict(params), False
+        return best[1], best[2], True
@@ -0,0 +1,232 @@
+"""
+Source deduplication for research results.
+Canonicalizes URLs and clusters near-duplicate content with MinHash
+so that mirrors, syndicated copies and tracking-parameter variants
+are only passed to the LLM once.
+"""
+
+import hashlib
+import re
+from typing import Dict, Any, List, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that never change the page content
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid",
+    "igshid", "ref_src", "ref_url", "spm", "_hsenc", "_hsmi",
+    "ocid", "cmpid", "si",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "vero_", "hsa_")
+# Parameters that are only tracking on some hosts (e.g. GitHub's ?ref= selects a branch)
+HOST_TRACKING_PARAMS = {
+    "youtube.com": {"feature"},
+    "youtu.be": {"feature"},
+    "producthunt.com": {"ref"},
+}
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+NUM_BANDS = 16
+SIMILARITY_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so that trivially different variants compare equal."""
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+
+    scheme = (parts.scheme or "http").lower()
+    if scheme == "http":
+        scheme = "https"
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    elif host.startswith("m.") or host.startswith("amp."):
+        host = host.split(".", 1)[1]
+    port = parts.port
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    path = re.sub(r"/(amp|index\.html?)/?$", "/", path)
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    host_params = HOST_TRACKING_PARAMS.get(host, set())
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and key.lower() not in host_params
+        and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+
+    # Fragments never reach the server, so they are dropped entirely
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) used for reporting."""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def _shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _permutations(num_perm: int) -> List[Tuple[int, int]]:
+    # Deterministic seeds keep signatures stable across processes and runs
+    perms = []
+    for i in range(num_perm):
+        digest = hashlib.sha1(f"minhash-{i}".encode()).digest()
+        a = int.from_bytes(digest[:8], "big") % _MERSENNE_PRIME or 1
+        b = int.from_bytes(digest[8:16], "big") % _MERSENNE_PRIME
+        perms.append((a, b))
+    return perms
+
+
+_PERMUTATIONS = _permutations(NUM_PERM)
+
+
+def minhash_signature(text: str) -> List[int]:
+    """Compute the MinHash signature of a text's word shingles."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=4).digest(), "big")
+        for shingle in _shingles(text)
+    ]
+    if not hashes:
+        return [_MAX_HASH] * NUM_PERM
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimate Jaccard similarity from two MinHash signatures."""
+    if not sig_a or not sig_b:
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def _source_text(source: Any) -> str:
+    return " ".join(
+        str(source.get(field) or "")
+        for field in ("title", "description", "content", "markdown", "snippet")
+    ).strip()
+
+
+def _source_score(source: Any) -> Tuple[int, int, int]:
+    # Prefer sources with real content, then a title, then longer descriptions
+    content_length = source.get("content_length") or len(source.get("content") or source.get("markdown") or "")
+    return (
+        content_length,
+        1 if source.get("title") else 0,
+        len(source.get("description") or source.get("snippet") or ""),
+    )
+
+
+def dedupe_sources(
+    sources: List[Dict[str, Any]],
+    threshold: float = SIMILARITY_THRESHOLD,
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Remove duplicate and near-duplicate sources.
+
+    Returns the best representative of each cluster, in order of first
+    appearance, plus stats about what was removed.
+    """
+    # Accepts dicts or dict-like records exposing .get()
+    sources = [s for s in sources or [] if hasattr(s, "get")]
+    count = len(sources)
+    parent = list(range(count))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    # Exact duplicates by canonical URL
+    url_duplicates = 0
+    seen_urls: Dict[str, int] = {}
+    for i, source in enumerate(sources):
+        canonical = canonicalize_url(source.get("url", ""))
+        if not canonical:
+            continue
+        if canonical in seen_urls:
+            union(seen_urls[canonical], i)
+            url_duplicates += 1
+        else:
+            seen_urls[canonical] = i
+
+    # Near duplicates by content, using LSH banding to find candidate pairs
+    texts = [_source_text(source) for source in sources]
+    signatures = [minhash_signature(text) for text in texts]
+    rows = NUM_PERM // NUM_BANDS
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    for i, signature in enumerate(signatures):
+        if not texts[i]:
+            continue
+        for band in range(NUM_BANDS):
+            key = (band, tuple(signature[band * rows:(band + 1) * rows]))
+            buckets.setdefault(key, []).append(i)
+
+    checked = set()
+    for members in buckets.values():
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                pair = (members[x], members[y])
+                if pair in checked:
+                    continue
+                checked.add(pair)
+                if estimate_similarity(signatures[pair[0]], signatures[pair[1]]) >= threshold:
+                    union(*pair)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(count):
+        clusters.setdefault(find(i), []).append(i)
+
+    kept_indices = sorted(
+        max(members, key=lambda i: (_source_score(sources[i]), -i))
+        for members in clusters.values()
+    )
+    kept = [sources[i] for i in kept_indices]
+
+    # Measured on the full source text, not on the (much shorter) tool output the LLM sees
+    tokens_before = sum(estimate_tokens(text) for text in texts)
+    tokens_after = sum(estimate_tokens(texts[i]) for i in kept_indices)
+    stats = {
+        "sources_in": count,
+        "sources_out": len(kept),
+        "url_duplicates": url_duplicates,
+        "near_duplicates": count - len(kept) - url_duplicates,
+        "source_tokens_before": tokens_before,
+        "source_tokens_after": tokens_after,
+        "source_tokens_removed": tokens_before - tokens_after,
+    }
+    return kept, stats
+
+
+def format_dedup_stats(stats: Dict[str, int]) -> str:
+    """One-line summary of a dedup pass for research output."""
+    return (
+        f"{stats['sources_in'] - stats['sources_out']} duplicate sources removed "
+        f"({stats['url_duplicates']} by URL, {stats['near_duplicates']} near-duplicate), "
+        f"~{stats['source_tokens_removed']} tokens of duplicate source text dropped"
+    )